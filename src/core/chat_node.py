@@ -6,6 +6,7 @@ import hashlib
 import json
 import time
 import uuid
+from collections import deque
 from typing import Dict, List, Optional
 
 from ..crypto.crypto_manager import CryptoManager
@@ -16,7 +17,7 @@ from ..multimedia.multimedia import EncryptedMultimediaProcessor, MultimediaMess
 from ..incentive.incentive_mechanism import IncentiveMechanism, NodeType
 from ..routing.routing_manager import RoutingTableManager, NodeInfo
 from ..gossip.gossip_protocol import GossipManager, GossipType
-from ..vdf.vdf import VDFManager
+from ..vdf.vdf import VDFManager, shutdown_verify_pool, warmup as warmup_vdf_kernels
 from ..zkp.zkp import ZKPManager
 from ..network.nat_traversal import NATTraverser, setup_nat_traversal
 from ..p2p.node_server import NodeServer
@@ -47,10 +48,28 @@ class ChatNode:
         self.enable_nat_traversal = enable_nat_traversal
         self.nat_traverser = None
         self.public_url = None  # 用于存储公共访问URL
+        # NAT检测结果，NAT穿越成功后更新
+        self.nat_type = 'unknown'
+        self.external_ip = None
+        self.external_port = None
+        self.is_nat_traversable = False
         self.start_time = time.time()  # 添加启动时间
         self.pigeon_cache = {}  # 信鸽协议缓存
+        self.max_pigeon_messages = 10000  # 每个DID最多缓存的离线消息数，超出后淘汰最旧的
         # 更新addr为元组格式
         self.addr = (addr, port)
+        # 消息类型 -> 处理函数的分发表
+        self._message_handlers = {
+            "HELLO": self._on_hello,
+            "DIRECT_MSG": self._on_direct_msg,
+            "RELAY_MSG": self._on_relay_msg,
+            "CONSENSUS_PROPOSAL": self._on_consensus_proposal,
+            "BLOCKCHAIN_SYNC": self._on_blockchain_sync,
+            "BLOCKCHAIN_INFO_REQUEST": self._on_blockchain_info_request,
+            "BLOCKCHAIN_RESPONSE": self._on_blockchain_response,
+            "PING": self._on_ping,
+            "GOSSIP_MESSAGE": self._on_gossip_message,
+        }
         # 创建服务器实例
         self.server = NodeServer(self.addr[0], self.addr[1], self.handle_message)
 
@@ -64,15 +83,24 @@ class ChatNode:
             print("[*] 正在配置NAT穿越...")
             from ..config.config import get_config
             config = get_config()
+            if self.nat_traverser is None:
+                self.nat_traverser = NATTraverser(config.config)
             success, public_url, nat_result = await setup_nat_traversal(
-                config.config, self.addr[1]
+                config.config, self.addr[1], self.nat_traverser
             )
             if success:
                 self.public_url = public_url
+                self.nat_type = nat_result.nat_type
+                self.external_ip = nat_result.external_ip
+                self.external_port = nat_result.external_port
+                self.is_nat_traversable = nat_result.is_traversable
                 print(f"[✓] NAT穿越配置成功，公共URL: {public_url}")
             else:
                 print(f"[-] NAT穿越配置失败，节点可能无法被外部访问")
         
+        # 在线程池中预热VDF哈希链内核，首次验证时不再承担编译（或加载缓存）的开销
+        await asyncio.get_running_loop().run_in_executor(None, warmup_vdf_kernels)
+
         await self.server.start()
         
         # 加入网络
@@ -94,6 +122,9 @@ class ChatNode:
         
         # 停止服务器
         await self.server.stop()
+
+        # 关闭VDF并行验证使用的进程池
+        await asyncio.get_running_loop().run_in_executor(None, shutdown_verify_pool)
         
         self.running = False
         print(f"[✓] 节点 {self.node_id} 已停止")
@@ -171,249 +202,263 @@ class ChatNode:
             if int(time.time()) % 60 == 0:  # 每分钟清理一次
                 self.anti_replay.cleanup_old_messages()
 
-            if msg_type == "HELLO":
-                # 记录新节点
-                self.routing_table_manager.add_node(
-                    node_id=msg['sender_id'],
-                    host=msg['addr'][0],
-                    port=msg['addr'][1],
-                    pub_key=msg['pub_key'],
-                    public_url=msg.get('public_url')
-                )
-                # 返回我的路由表作为欢迎
-                current_routing = {nid: node_info.to_dict()
-                                  for nid, node_info in self.routing_table_manager.routing_table.items()}
-                current_routing[self.node_id] = {"host": self.addr[0], "port": self.addr[1], "pub_key": self.crypto.get_pub_key_pem(), "public_url": getattr(self, 'public_url', None)}
-                
-                # 更新激励机制：成功建立连接
-                self.incentive_mechanism.update_node_metrics(
-                    self.node_id,
-                    uptime=time.time() - self.start_time
-                )
-                
-                return {"type": "WELCOME", "routing_table": current_routing}
-
-            elif msg_type == "DIRECT_MSG":
-                # 验证消息签名
-                sender_id = msg['sender_id']
-                encrypted_payload = msg['encrypted_payload']
-                signature = msg.get('signature')
-
-                if signature:
-                    # 获取发送方公钥
-                    sender_node = self.routing_table_manager.get_node(sender_id)
-                    if sender_node:
-                        sender_pub_key = CryptoManager.load_pub_key(sender_node.pub_key)
-                        # 验证签名
-                        if not CryptoManager.verify(sender_pub_key, str(encrypted_payload), signature):
-                            print(f"[!] 消息签名验证失败: {sender_id}")
-                            return {"type": "SIGNATURE_ERROR", "status": "invalid signature"}
-
-                # 更新激励机制：接收消息
-                self.incentive_mechanism.update_node_metrics(
-                    self.node_id,
-                    bandwidth_provided=len(str(msg).encode('utf-8'))
-                )
+            handler = self._message_handlers.get(msg_type)
+            if handler is None:
+                return None
+            return await handler(msg, writer)
+        except Exception as e:
+            print(f"[!] 处理消息时发生错误: {e}")
+            return {"type": "ERROR", "status": f"message processing failed: {str(e)}"}
 
-                # 尝试解密
-                try:
-                    content = self.crypto.hybrid_decrypt(encrypted_payload)
-                    print(f"\n[🔔] 收到来自 {msg['sender_id']} 的加密消息: {content}")
+    async def _on_hello(self, msg: dict, writer) -> Optional[dict]:
+        """处理握手消息"""
+        # 记录新节点
+        self.routing_table_manager.add_node(
+            node_id=msg['sender_id'],
+            host=msg['addr'][0],
+            port=msg['addr'][1],
+            pub_key=msg['pub_key'],
+            public_url=msg.get('public_url')
+        )
+        # 返回我的路由表作为欢迎
+        current_routing = {nid: node_info.to_dict()
+                          for nid, node_info in self.routing_table_manager.routing_table.items()}
+        current_routing[self.node_id] = {"host": self.addr[0], "port": self.addr[1], "pub_key": self.crypto.get_pub_key_pem(), "public_url": getattr(self, 'public_url', None)}
+        
+        # 更新激励机制：成功建立连接
+        self.incentive_mechanism.update_node_metrics(
+            self.node_id,
+            uptime=time.time() - self.start_time
+        )
+        
+        return {"type": "WELCOME", "routing_table": current_routing}
+
+    async def _on_direct_msg(self, msg: dict, writer) -> Optional[dict]:
+        """处理端到端加密消息"""
+        # 验证消息签名
+        sender_id = msg['sender_id']
+        encrypted_payload = msg['encrypted_payload']
+        signature = msg.get('signature')
+
+        if signature:
+            # 获取发送方公钥
+            sender_node = self.routing_table_manager.get_node(sender_id)
+            if sender_node:
+                sender_pub_key = CryptoManager.load_pub_key(sender_node.pub_key)
+                # 验证签名
+                if not CryptoManager.verify(sender_pub_key, str(encrypted_payload), signature):
+                    print(f"[!] 消息签名验证失败: {sender_id}")
+                    return {"type": "SIGNATURE_ERROR", "status": "invalid signature"}
+
+        # 更新激励机制：接收消息
+        self.incentive_mechanism.update_node_metrics(
+            self.node_id,
+            bandwidth_provided=len(str(msg).encode('utf-8'))
+        )
 
-                    # 检查是否为多媒体消息
-                    if content.startswith("MULTIMEDIA:"):
-                        # 解析多媒体消息
-                        try:
-                            multimedia_data = json.loads(content[11:])  # 移除"MULTIMEDIA:"前缀
-                            multimedia_msg = MultimediaMessage.from_dict(multimedia_data)
+        # 尝试解密
+        try:
+            content = self.crypto.hybrid_decrypt(encrypted_payload)
+            print(f"\n[🔔] 收到来自 {msg['sender_id']} 的加密消息: {content}")
 
-                            # 解密多媒体消息（如果需要）
-                            if multimedia_msg.metadata.get('encrypted'):
-                                multimedia_msg = self.multimedia_processor.decrypt_multimedia_message(multimedia_msg)
+            # 检查是否为多媒体消息
+            if content.startswith("MULTIMEDIA:"):
+                # 解析多媒体消息
+                try:
+                    multimedia_data = json.loads(content[11:])  # 移除"MULTIMEDIA:"前缀
+                    multimedia_msg = MultimediaMessage.from_dict(multimedia_data)
 
-                            print(f"[🖼️] 收到多媒体消息 - 类型: {multimedia_msg.media_type}, 大小: {len(multimedia_msg.data)} bytes")
+                    # 解密多媒体消息（如果需要）
+                    if multimedia_msg.metadata.get('encrypted'):
+                        multimedia_msg = self.multimedia_processor.decrypt_multimedia_message(multimedia_msg)
 
-                            # 保存多媒体内容到本地
-                            file_ext = multimedia_msg.get_file_extension()
-                            file_path = f"received_{multimedia_msg.message_id}{file_ext}"
-                            if self.multimedia_processor.save_to_file(multimedia_msg, file_path):
-                                print(f"[💾] 多媒体内容已保存到: {file_path}")
+                    print(f"[🖼️] 收到多媒体消息 - 类型: {multimedia_msg.media_type}, 大小: {len(multimedia_msg.data)} bytes")
 
-                            # 更新激励机制：处理多媒体内容
-                            self.incentive_mechanism.update_node_metrics(
-                                self.node_id,
-                                storage_provided=len(multimedia_msg.data)
-                            )
+                    # 保存多媒体内容到本地
+                    file_ext = multimedia_msg.get_file_extension()
+                    file_path = f"received_{multimedia_msg.message_id}{file_ext}"
+                    if self.multimedia_processor.save_to_file(multimedia_msg, file_path):
+                        print(f"[💾] 多媒体内容已保存到: {file_path}")
 
-                        except Exception as e:
-                            print(f"[!] 解析多媒体消息失败: {e}")
-                            # 如果解析失败，按普通消息处理
-                            print(f"    原始内容: {content}")
-                    else:
-                        # 将消息记录到区块链
-                        block_data = f"MSG:{msg['sender_id']}->{self.node_id}:{content}"
-                        from ..blockchain.block import Block
-                        new_block = Block(
-                            index=len(self.blockchain.chain),
-                            previous_hash=self.blockchain.get_latest_block().hash,
-                            timestamp=time.time(),
-                            data=block_data,
-                            proposer=self.node_id
-                        )
-                        self.blockchain.add_block(new_block)
-
-                    # 检查是否有离线消息需要提取 (模拟 Pigon Protocol 提取)
-                    if self.get_did() in self.pigeon_cache:
-                        print(f"    └── [信鸽] 自动提取了 {len(self.pigeon_cache[self.get_did()])} 条离线缓存消息")
-                        self.pigeon_cache.pop(self.get_did())
-
-                        # 更新激励机制：提取离线消息
-                        self.incentive_mechanism.update_node_metrics(
-                            self.node_id,
-                            messages_forwarded=len(self.pigeon_cache[self.get_did()])
-                        )
+                    # 更新激励机制：处理多媒体内容
+                    self.incentive_mechanism.update_node_metrics(
+                        self.node_id,
+                        storage_provided=len(multimedia_msg.data)
+                    )
 
                 except Exception as e:
-                    print(f"[!] 解密失败: {e}")
-                return {"type": "ACK", "status": "received"}
-
-            elif msg_type == "RELAY_MSG":
-                # 信鸽协议：帮别人缓存消息
-                target_did = msg['target_did']
-                print(f"[🕊️] 信鸽中继：为 {target_did} 缓存了一条离线消息")
-                if target_did not in self.pigeon_cache:
-                    self.pigeon_cache[target_did] = []
-                self.pigeon_cache[target_did].append(msg['payload'])
-
-                # 更新激励机制：转发消息
-                self.incentive_mechanism.update_node_metrics(
-                    self.node_id,
-                    messages_forwarded=1,
-                    bandwidth_provided=len(str(msg).encode('utf-8'))
+                    print(f"[!] 解析多媒体消息失败: {e}")
+                    # 如果解析失败，按普通消息处理
+                    print(f"    原始内容: {content}")
+            else:
+                # 将消息记录到区块链
+                block_data = f"MSG:{msg['sender_id']}->{self.node_id}:{content}"
+                from ..blockchain.block import Block
+                new_block = Block(
+                    index=len(self.blockchain.chain),
+                    previous_hash=self.blockchain.get_latest_block().hash,
+                    timestamp=time.time(),
+                    data=block_data,
+                    proposer=self.node_id
                 )
+                self.blockchain.add_block(new_block)
 
-                return {"type": "ACK", "status": "cached"}
-
-            elif msg_type == "CONSENSUS_PROPOSAL":
-                # 处理共识提案
-                await self.handle_consensus_proposal(msg)
+            # 检查是否有离线消息需要提取 (模拟 Pigon Protocol 提取)
+            if self.get_did() in self.pigeon_cache:
+                print(f"    └── [信鸽] 自动提取了 {len(self.pigeon_cache[self.get_did()])} 条离线缓存消息")
+                self.pigeon_cache.pop(self.get_did())
 
-                # 更新激励机制：参与共识
+                # 更新激励机制：提取离线消息
                 self.incentive_mechanism.update_node_metrics(
                     self.node_id,
-                    blocks_validated=1
+                    messages_forwarded=len(self.pigeon_cache[self.get_did()])
                 )
 
-                return None
+        except Exception as e:
+            print(f"[!] 解密失败: {e}")
+        return {"type": "ACK", "status": "received"}
+
+    async def _on_relay_msg(self, msg: dict, writer) -> Optional[dict]:
+        """处理信鸽中继消息"""
+        # 信鸽协议：帮别人缓存消息
+        target_did = msg['target_did']
+        print(f"[🕊️] 信鸽中继：为 {target_did} 缓存了一条离线消息")
+        if target_did not in self.pigeon_cache:
+            self.pigeon_cache[target_did] = deque(maxlen=self.max_pigeon_messages)
+        self.pigeon_cache[target_did].append(msg['payload'])
+
+        # 更新激励机制：转发消息
+        self.incentive_mechanism.update_node_metrics(
+            self.node_id,
+            messages_forwarded=1,
+            bandwidth_provided=len(str(msg).encode('utf-8'))
+        )
 
-            elif msg_type == "BLOCKCHAIN_SYNC":
-                # 区块链同步请求
-                # 更新激励机制：提供区块链数据
-                self.incentive_mechanism.update_node_metrics(
-                    self.node_id,
-                    bandwidth_provided=1024  # 估算的带宽使用
-                )
+        return {"type": "ACK", "status": "cached"}
 
-                # 根据请求参数返回区块链数据
-                start_index = msg.get('start_index', 0)
-                end_index = msg.get('end_index', len(self.blockchain.chain))
+    async def _on_consensus_proposal(self, msg: dict, writer) -> Optional[dict]:
+        """处理共识提案消息"""
+        # 处理共识提案
+        await self.handle_consensus_proposal(msg)
 
-                if start_index < 0 or end_index > len(self.blockchain.chain):
-                    # 返回完整链信息
-                    return {
-                        "type": "BLOCKCHAIN_RESPONSE",
-                        "chain_info": self.blockchain.get_chain_info(),
-                        "chain": self.blockchain.to_list()
-                    }
-                else:
-                    # 返回指定范围的区块链数据
-                    chain_data = self.blockchain.get_block_range(start_index, end_index)
-                    return {
-                        "type": "BLOCKCHAIN_RESPONSE",
-                        "chain_info": self.blockchain.get_chain_info(),
-                        "chain": chain_data,
-                        "start_index": start_index,
-                        "end_index": end_index
-                    }
+        # 更新激励机制：参与共识
+        self.incentive_mechanism.update_node_metrics(
+            self.node_id,
+            blocks_validated=1
+        )
+
+        return None
+
+    async def _on_blockchain_sync(self, msg: dict, writer) -> Optional[dict]:
+        """处理区块链同步请求"""
+        # 区块链同步请求
+        # 更新激励机制：提供区块链数据
+        self.incentive_mechanism.update_node_metrics(
+            self.node_id,
+            bandwidth_provided=1024  # 估算的带宽使用
+        )
+
+        # 根据请求参数返回区块链数据
+        start_index = msg.get('start_index', 0)
+        end_index = msg.get('end_index', len(self.blockchain.chain))
+
+        if start_index < 0 or end_index > len(self.blockchain.chain):
+            # 返回完整链信息
+            return {
+                "type": "BLOCKCHAIN_RESPONSE",
+                "chain_info": self.blockchain.get_chain_info(),
+                "chain": self.blockchain.to_list()
+            }
+        else:
+            # 返回指定范围的区块链数据
+            chain_data = self.blockchain.get_block_range(start_index, end_index)
+            return {
+                "type": "BLOCKCHAIN_RESPONSE",
+                "chain_info": self.blockchain.get_chain_info(),
+                "chain": chain_data,
+                "start_index": start_index,
+                "end_index": end_index
+            }
+
+    async def _on_blockchain_info_request(self, msg: dict, writer) -> Optional[dict]:
+        """处理区块链信息请求"""
+        # 区块链信息请求 - 只返回链的基本信息，不传输整个链
+        return {
+            "type": "BLOCKCHAIN_INFO_RESPONSE",
+            "chain_info": self.blockchain.get_chain_info()
+        }
 
-            elif msg_type == "BLOCKCHAIN_INFO_REQUEST":
-                # 区块链信息请求 - 只返回链的基本信息，不传输整个链
-                return {
-                    "type": "BLOCKCHAIN_INFO_RESPONSE",
-                    "chain_info": self.blockchain.get_chain_info()
-                }
-
-            elif msg_type == "BLOCKCHAIN_RESPONSE":
-                # 处理区块链同步响应
-                chain_info = msg.get('chain_info', {})
-                received_chain = msg.get('chain', [])
-                start_index = msg.get('start_index')
-                end_index = msg.get('end_index')
-
-                # 检查是否是完整链同步
-                if start_index is None or end_index is None:
-                    # 完整链同步
-                    if len(received_chain) > len(self.blockchain.chain):
-                        # 接收更长的链
-                        from ..blockchain.blockchain import Blockchain
-                        new_blockchain = Blockchain(consensus_type=self.blockchain.consensus_type)
-                        new_blockchain.from_list(received_chain)
-                        if new_blockchain.is_chain_valid():
-                            self.blockchain = new_blockchain
-                            print("[✓] 区块链已同步到最新状态")
-
-                            # 更新激励机制：成功同步区块链
-                            self.incentive_mechanism.update_node_metrics(
-                                self.node_id,
-                                uptime=time.time() - self.start_time
-                            )
-                        else:
-                            print("[!] 接收的区块链无效")
+    async def _on_blockchain_response(self, msg: dict, writer) -> Optional[dict]:
+        """处理区块链同步响应"""
+        # 处理区块链同步响应
+        chain_info = msg.get('chain_info', {})
+        received_chain = msg.get('chain', [])
+        start_index = msg.get('start_index')
+        end_index = msg.get('end_index')
+
+        # 检查是否是完整链同步
+        if start_index is None or end_index is None:
+            # 完整链同步
+            if len(received_chain) > len(self.blockchain.chain):
+                # 接收更长的链
+                from ..blockchain.blockchain import Blockchain
+                new_blockchain = Blockchain(consensus_type=self.blockchain.consensus_type)
+                new_blockchain.from_list(received_chain)
+                if new_blockchain.is_chain_valid():
+                    self.blockchain = new_blockchain
+                    print("[✓] 区块链已同步到最新状态")
+
+                    # 更新激励机制：成功同步区块链
+                    self.incentive_mechanism.update_node_metrics(
+                        self.node_id,
+                        uptime=time.time() - self.start_time
+                    )
                 else:
-                    # 部分链同步 - 用于大规模网络优化
-                    if len(received_chain) > 0:
-                        # 检查接收到的区块是否与当前链一致
-                        if start_index < len(self.blockchain.chain):
-                            # 如果起始区块已存在，只添加新区块
-                            current_block = self.blockchain.chain[start_index]
-                            received_first_block = received_chain[0]
-
-                            if current_block.hash == received_first_block['hash']:
-                                # 添加新区块
-                                for block_data in received_chain[1:]:
-                                    from ..blockchain.block import Block
-                                    new_block = Block.from_dict(block_data)
-                                    if len(self.blockchain.chain) > 0:
-                                        new_block.previous_hash = self.blockchain.get_latest_block().hash
-                                    self.blockchain.chain.append(new_block)
-                                print(f"[✓] 部分区块链已同步 ({start_index+1}-{start_index+len(received_chain)-1})")
-                            else:
-                                print("[!] 接收到的区块链与当前链不一致")
-                        else:
-                            # 如果起始区块不存在，需要重新同步
-                            print("[!] 需要从更早的区块开始同步")
+                    print("[!] 接收的区块链无效")
+        else:
+            # 部分链同步 - 用于大规模网络优化
+            if len(received_chain) > 0:
+                # 检查接收到的区块是否与当前链一致
+                if start_index < len(self.blockchain.chain):
+                    # 如果起始区块已存在，只添加新区块
+                    current_block = self.blockchain.chain[start_index]
+                    received_first_block = received_chain[0]
+
+                    if current_block.hash == received_first_block['hash']:
+                        # 添加新区块
+                        for block_data in received_chain[1:]:
+                            from ..blockchain.block import Block
+                            new_block = Block.from_dict(block_data)
+                            if len(self.blockchain.chain) > 0:
+                                new_block.previous_hash = self.blockchain.get_latest_block().hash
+                            self.blockchain.chain.append(new_block)
+                        print(f"[✓] 部分区块链已同步 ({start_index+1}-{start_index+len(received_chain)-1})")
+                    else:
+                        print("[!] 接收到的区块链与当前链不一致")
+                else:
+                    # 如果起始区块不存在，需要重新同步
+                    print("[!] 需要从更早的区块开始同步")
 
-                return None
-            
-            elif msg_type == "PING":
-                # 响应ping请求
-                return {"type": "PONG", "timestamp": time.time(), "node_id": self.node_id}
-
-            elif msg_type == "GOSSIP_MESSAGE":
-                # 处理Gossip消息
-                gossip_data = msg.get('gossip_data', {})
-                response = await self.gossip_manager.handle_incoming_gossip(gossip_data)
-                
-                # 更新激励机制：参与Gossip传播
-                self.incentive_mechanism.update_node_metrics(
-                    self.node_id,
-                    messages_forwarded=1
-                )
-                
-                return response
-        except Exception as e:
-            print(f"[!] 处理消息时发生错误: {e}")
-            return {"type": "ERROR", "status": f"message processing failed: {str(e)}"}
+        return None
+
+    async def _on_ping(self, msg: dict, writer) -> Optional[dict]:
+        """处理ping请求"""
+        # 响应ping请求
+        return {"type": "PONG", "timestamp": time.time(), "node_id": self.node_id}
+
+    async def _on_gossip_message(self, msg: dict, writer) -> Optional[dict]:
+        """处理Gossip消息"""
+        # 处理Gossip消息
+        gossip_data = msg.get('gossip_data', {})
+        response = await self.gossip_manager.handle_incoming_gossip(gossip_data)
+        
+        # 更新激励机制：参与Gossip传播
+        self.incentive_mechanism.update_node_metrics(
+            self.node_id,
+            messages_forwarded=1
+        )
+        
+        return response
 
     async def handle_consensus_proposal(self, msg: dict):
         """处理共识提案"""
@@ -591,29 +636,21 @@ class ChatNode:
                 # 等待一段时间后重试
                 await asyncio.sleep(1 * (attempt + 1))  # 递增延迟
 
-    async def send_multimedia_message(self, target_node_id: str, media_type: str, data: bytes, metadata: dict = None, max_retries: int = 3):
-        """发送多媒体消息，带重试机制"""
-        target_node = self.routing_table_manager.get_node(target_node_id)
-        if not target_node:
-            print(f"[!] 未找到节点 {target_node_id}，无法发送多媒体消息")
-            return
-        
-        target = target_node.to_dict()
-
+    def _build_multimedia_payload(self, target_pub_key: str, media_type: str, data: bytes, metadata: dict = None):
+        """创建、加密并签名多媒体消息，返回(多媒体消息, 待发送的消息体)，失败时返回None"""
         # 创建多媒体消息
         multimedia_msg = self.multimedia_processor.create_multimedia_message(
             media_type, data, metadata
         )
         
         if not multimedia_msg:
-            print("[!] 创建多媒体消息失败")
-            return
+            return None
 
         # 序列化多媒体消息
         multimedia_content = f"MULTIMEDIA:{json.dumps(multimedia_msg.to_dict())}"
         
         # 加密多媒体内容
-        encrypted = self.crypto.hybrid_encrypt(target['pub_key'], multimedia_content)
+        encrypted = self.crypto.hybrid_encrypt(target_pub_key, multimedia_content)
         
         # 生成唯一消息ID以防止重放
         msg_id = str(uuid.uuid4())
@@ -629,6 +666,25 @@ class ChatNode:
             "nonce": nonce,  # 添加防重放随机数
             "signature": self.crypto.sign(str(encrypted))  # 添加数字签名
         }
+        return multimedia_msg, payload
+
+    async def send_multimedia_message(self, target_node_id: str, media_type: str, data: bytes, metadata: dict = None, max_retries: int = 3):
+        """发送多媒体消息，带重试机制"""
+        target_node = self.routing_table_manager.get_node(target_node_id)
+        if not target_node:
+            print(f"[!] 未找到节点 {target_node_id}，无法发送多媒体消息")
+            return
+        
+        target = target_node.to_dict()
+
+        # 媒体处理、加密、编码和签名的开销与文件大小成正比，放到线程池中执行以免阻塞事件循环
+        prepared = await asyncio.get_running_loop().run_in_executor(
+            None, self._build_multimedia_payload, target['pub_key'], media_type, data, metadata
+        )
+        if prepared is None:
+            print("[!] 创建多媒体消息失败")
+            return
+        multimedia_msg, payload = prepared
 
         for attempt in range(max_retries):
             try:
@@ -945,11 +1001,20 @@ class ChatNode:
     def get_node_stats(self):
         """获取节点统计信息"""
         uptime = time.time() - self.start_time
+        # 一次遍历同时统计两类消息（"MULTIMEDIA_MSG:"也包含"MSG:"，与原先的计数口径一致）
+        messages_sent = 0
+        multimedia_messages_sent = 0
+        for block in self.blockchain.chain:
+            data = block.data
+            if "MSG:" in data:
+                messages_sent += 1
+                if "MULTIMEDIA_MSG:" in data:
+                    multimedia_messages_sent += 1
         return {
             "node_id": self.node_id,
             "uptime": uptime,
-            "messages_sent": sum(1 for block in self.blockchain.chain if "MSG:" in block.data),
-            "multimedia_messages_sent": sum(1 for block in self.blockchain.chain if "MULTIMEDIA_MSG:" in block.data),
+            "messages_sent": messages_sent,
+            "multimedia_messages_sent": multimedia_messages_sent,
             "routing_table_size": len(self.routing_table_manager.routing_table),
             "incentive_info": self.incentive_mechanism.get_node_info(self.node_id)
         }
\ No newline at end of file
@@ -14,6 +14,15 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import json
+from functools import lru_cache
+
+
+# RSA-OAEP填充参数，无状态，可在所有加解密调用间复用
+_OAEP_SHA256 = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
 
 
 class KeyExchangeManager:
@@ -55,11 +64,7 @@ class KeyExchangeManager:
         # 使用对方公钥加密预共享密钥
         encrypted_pre_shared_secret = peer_public_key.encrypt(
             pre_shared_secret,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
+            _OAEP_SHA256
         )
         
         # 使用KDF从预共享密钥派生实际的共享密钥
@@ -85,11 +90,7 @@ class KeyExchangeManager:
         # 使用私钥解密预共享密钥
         pre_shared_secret = private_key.decrypt(
             encrypted_pre_shared_secret,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
+            _OAEP_SHA256
         )
         
         # 使用KDF从预共享密钥派生实际的共享密钥
@@ -126,7 +127,7 @@ class CryptoManager:
             encoding=serialization.Encoding.PEM,
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         )
-        return hashlib.sha256(pem).hexdigest()[:16]  # 取前16个字符作为节点ID
+        return hashlib.blake2b(pem, digest_size=8).hexdigest()  # 8字节摘要即16个十六进制字符的节点ID
 
     def get_pub_key_pem(self) -> str:
         """获取公钥PEM格式"""
@@ -141,8 +142,9 @@ class CryptoManager:
         return self.node_id
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def load_pub_key(pem_str: str):
-        """从PEM格式加载公钥"""
+        """从PEM格式加载公钥（解析结果按PEM缓存，重复向同一节点加密时无需再次解析）"""
         return serialization.load_pem_public_key(pem_str.encode(), backend=default_backend())
 
     def sign(self, message: str) -> str:
@@ -198,11 +200,7 @@ class CryptoManager:
         # 3. 使用接收方公钥加密AES密钥
         encrypted_key = target_pub_key.encrypt(
             aes_key,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()), 
-                algorithm=hashes.SHA256(), 
-                label=None
-            )
+            _OAEP_SHA256
         )
 
         return {
@@ -220,11 +218,7 @@ class CryptoManager:
         encrypted_key = base64.b64decode(encrypted_package['enc_key'])
         aes_key = self.private_key.decrypt(
             encrypted_key,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()), 
-                algorithm=hashes.SHA256(), 
-                label=None
-            )
+            _OAEP_SHA256
         )
 
         # 2. 解密数据
@@ -261,11 +255,7 @@ class CryptoManager:
             target_pub_key = CryptoManager.load_pub_key(pub_key_pem)
             encrypted_session_key = target_pub_key.encrypt(
                 session_key,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()), 
-                    algorithm=hashes.SHA256(), 
-                    label=None
-                )
+                _OAEP_SHA256
             )
             encrypted_keys.append(base64.b64encode(encrypted_session_key).decode())
         
@@ -290,11 +280,7 @@ class CryptoManager:
                     encrypted_key = base64.b64decode(enc_key)
                     session_key = self.private_key.decrypt(
                         encrypted_key,
-                        padding.OAEP(
-                            mgf=padding.MGF1(algorithm=hashes.SHA256()), 
-                            algorithm=hashes.SHA256(), 
-                            label=None
-                        )
+                        _OAEP_SHA256
                     )
                     break  # 成功解密，退出循环
                 except:
@@ -7,11 +7,15 @@ import json
 import time
 import hashlib
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
 from enum import Enum
 import uuid
 
 
+# 声誉计算的换算系数（预先取倒数，避免每次调用重复做除法）
+_UPTIME_SCALE = 1 / 86400
+_MB100_SCALE = 1 / (1024 * 1024 * 100)
+
+
 class NodeType(Enum):
     """节点类型枚举"""
     FULL = "full"          # 完整节点：存储完整区块链，参与共识
@@ -19,17 +23,22 @@ class NodeType(Enum):
     LIGHT = "light"        # 轻节点：仅进行基本通信
 
 
-@dataclass
 class NodeMetrics:
     """节点指标数据"""
-    node_id: str
-    uptime: float  # 在线时间（秒）
-    bandwidth_provided: int  # 提供的带宽（字节）
-    storage_provided: int  # 提供的存储（字节）
-    messages_forwarded: int  # 转发的消息数
-    blocks_validated: int  # 验证的区块数
-    last_updated: float
-    reputation_score: float = 0.0  # 声誉分数
+    __slots__ = ("node_id", "uptime", "bandwidth_provided", "storage_provided",
+                 "messages_forwarded", "blocks_validated", "last_updated", "reputation_score")
+
+    def __init__(self, node_id: str, uptime: float, bandwidth_provided: int, storage_provided: int,
+                 messages_forwarded: int, blocks_validated: int, last_updated: float,
+                 reputation_score: float = 0.0):
+        self.node_id = node_id
+        self.uptime = uptime  # 在线时间（秒）
+        self.bandwidth_provided = bandwidth_provided  # 提供的带宽（字节）
+        self.storage_provided = storage_provided  # 提供的存储（字节）
+        self.messages_forwarded = messages_forwarded  # 转发的消息数
+        self.blocks_validated = blocks_validated  # 验证的区块数
+        self.last_updated = last_updated
+        self.reputation_score = reputation_score  # 声誉分数
 
 
 class RewardPool:
@@ -77,10 +86,12 @@ class IncentiveMechanism:
         self.node_types: Dict[str, NodeType] = {}
         self.node_balances: Dict[str, int] = {}
         self.balances_history: Dict[str, List[Tuple[float, int]]] = {}
+        self._info_cache: Dict[str, Dict] = {}  # get_node_info结果缓存，节点数据变化时失效
         self.running = False
 
     def register_node(self, node_id: str, node_type: NodeType = NodeType.LIGHT):
         """注册节点"""
+        self._info_cache.pop(node_id, None)
         self.node_types[node_id] = node_type
         self.node_balances[node_id] = 0
         self.balances_history[node_id] = [(time.time(), 0)]
@@ -109,6 +120,7 @@ class IncentiveMechanism:
                     setattr(metrics, key, value)
         
         metrics.last_updated = time.time()
+        self._info_cache.pop(node_id, None)
         self.calculate_reputation_score(node_id)
 
     def calculate_reputation_score(self, node_id: str):
@@ -117,26 +129,21 @@ class IncentiveMechanism:
             return 0.0
 
         metrics = self.node_metrics[node_id]
-        
-        # 计算声誉分数（基于多个因素）
-        uptime_score = min(metrics.uptime / 86400, 10)  # 最多10分，基于天数
-        bandwidth_score = min(metrics.bandwidth_provided / 1024 / 1024 / 100, 5)  # 基于MB
-        storage_score = min(metrics.storage_provided / 1024 / 1024 / 100, 5)  # 基于MB
-        message_score = min(metrics.messages_forwarded / 1000, 5)  # 基于千条消息
-        validation_score = min(metrics.blocks_validated / 100, 10)  # 基于百个区块
-
-        # 综合声誉分数
+
+        # 计算声誉分数（基于多个因素），各项为 min(指标/换算单位, 上限) * 权重
         reputation = (
-            uptime_score * 0.3 +
-            bandwidth_score * 0.2 +
-            storage_score * 0.2 +
-            message_score * 0.15 +
-            validation_score * 0.15
+            min(metrics.uptime * _UPTIME_SCALE, 10) * 0.3 +  # 最多10分，基于天数
+            min(metrics.bandwidth_provided * _MB100_SCALE, 5) * 0.2 +  # 基于MB
+            min(metrics.storage_provided * _MB100_SCALE, 5) * 0.2 +  # 基于MB
+            min(metrics.messages_forwarded * 0.001, 5) * 0.15 +  # 基于千条消息
+            min(metrics.blocks_validated * 0.01, 10) * 0.15  # 基于百个区块
         )
-        
+
         # 限制在0-100范围内
         reputation = max(0, min(100, reputation))
-        metrics.reputation_score = reputation
+        if reputation != metrics.reputation_score:
+            metrics.reputation_score = reputation
+            self._info_cache.pop(node_id, None)
         
         return reputation
 
@@ -195,6 +202,7 @@ class IncentiveMechanism:
             reward = self.calculate_reward(node_id)
             if reward > 0 and self.reward_pool.distribute_reward(node_id, reward, "periodic_distribute"):
                 self.node_balances[node_id] += reward
+                self._info_cache.pop(node_id, None)
                 self.balances_history[node_id].append((time.time(), self.node_balances[node_id]))
                 total_reward += reward
                 reward_details.append((node_id, reward))
@@ -202,12 +210,16 @@ class IncentiveMechanism:
         return reward_details, total_reward
 
     def get_node_info(self, node_id: str) -> Optional[Dict]:
-        """获取节点信息"""
-        if node_id not in self.node_metrics:
+        """获取节点信息（节点数据未变化时返回缓存的同一字典，调用方不应修改）"""
+        info = self._info_cache.get(node_id)
+        if info is not None:
+            return info
+
+        metrics = self.node_metrics.get(node_id)
+        if metrics is None:
             return None
 
-        metrics = self.node_metrics[node_id]
-        return {
+        info = self._info_cache[node_id] = {
             "node_id": node_id,
             "node_type": self.node_types[node_id].value,
             "balance": self.node_balances[node_id],
@@ -218,6 +230,7 @@ class IncentiveMechanism:
             "messages_forwarded": metrics.messages_forwarded,
             "blocks_validated": metrics.blocks_validated
         }
+        return info
 
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
         """获取排行榜"""
@@ -243,6 +256,7 @@ class IncentiveMechanism:
             return False
 
         self.node_balances[node_id] -= amount
+        self._info_cache.pop(node_id, None)
         # 在实际实现中，这里会将代币锁定到质押池中
         return True
 
@@ -21,12 +21,23 @@ class IPFSClient:
         self.session = None
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self._get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取HTTP会话，首次使用时创建并在之后复用，因此客户端也可以不经 async with 直接使用"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    async def close(self):
+        """关闭HTTP会话"""
         if self.session:
             await self.session.close()
+            self.session = None
 
     async def add_file(self, file_path: str) -> Optional[Dict[str, Any]]:
         """
@@ -48,7 +59,7 @@ class IPFSClient:
             form_data = aiohttp.FormData()
             form_data.add_field('file', data, filename=os.path.basename(file_path))
             
-            async with self.session.post(url, data=form_data) as response:
+            async with self._get_session().post(url, data=form_data) as response:
                 if response.status == 200:
                     result = await response.json()
                     result['local_hash'] = file_hash  # 添加本地计算的哈希
@@ -73,7 +84,7 @@ class IPFSClient:
             form_data = aiohttp.FormData()
             form_data.add_field('file', data, filename=filename)
             
-            async with self.session.post(url, data=form_data) as response:
+            async with self._get_session().post(url, data=form_data) as response:
                 if response.status == 200:
                     result = await response.json()
                     result['local_hash'] = data_hash  # 添加本地计算的哈希
@@ -103,7 +114,7 @@ class IPFSClient:
         try:
             url = f"{self.api_url}/api/v0/cat?arg={ipfs_hash}"
             
-            async with self.session.post(url) as response:
+            async with self._get_session().post(url) as response:
                 if response.status == 200:
                     content = await response.read()
                     
@@ -130,7 +141,7 @@ class IPFSClient:
         try:
             url = f"{self.api_url}/api/v0/cat?arg={ipfs_hash}"
             
-            async with self.session.post(url) as response:
+            async with self._get_session().post(url) as response:
                 if response.status == 200:
                     return await response.read()
                 else:
@@ -160,7 +171,7 @@ class IPFSClient:
         try:
             url = f"{self.api_url}/api/v0/pin/add?arg={ipfs_hash}"
             
-            async with self.session.post(url) as response:
+            async with self._get_session().post(url) as response:
                 if response.status == 200:
                     return True
                 else:
@@ -177,7 +188,7 @@ class IPFSClient:
         try:
             url = f"{self.api_url}/api/v0/pin/rm?arg={ipfs_hash}"
             
-            async with self.session.post(url) as response:
+            async with self._get_session().post(url) as response:
                 if response.status == 200:
                     return True
                 else:
@@ -194,7 +205,7 @@ class IPFSClient:
         try:
             url = f"{self.api_url}/api/v0/stats/bw"
             
-            async with self.session.post(url) as response:
+            async with self._get_session().post(url) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -357,4 +368,16 @@ class BlockchainIPFSBridge:
         if 'ipfs_hash' in reference_data:
             ipfs_hash = reference_data['ipfs_hash']
             return await self.ipfs_storage.retrieve_data(ipfs_hash)
-        return None
\ No newline at end of file
+        return None
+
+    async def store_large_data_batch(self, items: List[Any]) -> List[Optional[Dict[str, str]]]:
+        """
+        并发存储多个大型数据，返回的引用信息与输入顺序一一对应
+        """
+        return list(await asyncio.gather(*(self.store_large_data(item) for item in items)))
+
+    async def retrieve_large_data_batch(self, references: List[Dict[str, str]]) -> List[Optional[Any]]:
+        """
+        并发检索多个大型数据，结果与引用顺序一一对应
+        """
+        return list(await asyncio.gather(*(self.retrieve_large_data(ref) for ref in references)))
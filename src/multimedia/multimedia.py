@@ -16,6 +16,27 @@ from cryptography.hazmat.backends import default_backend
 import secrets
 
 
+# 媒体类型到文件扩展名的映射
+FILE_EXTENSIONS = {
+    'image': '.jpg',
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'audio': '.mp3',
+    'audio/mp3': '.mp3',
+    'audio/wav': '.wav',
+    'video': '.mp4',
+    'video/mp4': '.mp4',
+    'video/avi': '.avi',
+    'text/plain': '.txt',
+    'application/pdf': '.pdf',
+    'file': '.bin'
+}
+
+# PKCS7填充字节串查找表，下标为填充长度(1-16)
+_PKCS7_PADDING = tuple(bytes([n]) * n for n in range(17))
+
+
 class MultimediaMessage:
     """
     多媒体消息类
@@ -70,22 +91,7 @@ class MultimediaMessage:
 
     def get_file_extension(self) -> str:
         """根据媒体类型获取文件扩展名"""
-        extensions = {
-            'image': '.jpg',
-            'image/jpeg': '.jpg',
-            'image/png': '.png',
-            'image/gif': '.gif',
-            'audio': '.mp3',
-            'audio/mp3': '.mp3',
-            'audio/wav': '.wav',
-            'video': '.mp4',
-            'video/mp4': '.mp4',
-            'video/avi': '.avi',
-            'text/plain': '.txt',
-            'application/pdf': '.pdf',
-            'file': '.bin'
-        }
-        return extensions.get(self.media_type, '.bin')
+        return FILE_EXTENSIONS.get(self.media_type, '.bin')
 
 
 class MultimediaProcessor:
@@ -245,8 +251,7 @@ class EncryptedMultimediaProcessor(MultimediaProcessor):
         encryptor = cipher.encryptor()
         
         # 填充数据到16字节的倍数
-        padding_len = 16 - (len(data) % 16)
-        padded_data = data + bytes([padding_len] * padding_len)
+        padded_data = data + _PKCS7_PADDING[16 - (len(data) % 16)]
         
         # 加密数据
         encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
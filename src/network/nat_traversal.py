@@ -7,7 +7,7 @@ import socket
 import struct
 import requests
 import json
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 from dataclasses import dataclass
 import threading
 import time
@@ -21,6 +21,69 @@ except ImportError:
     print("[!] 未安装pyngrok，请运行 'pip install pyngrok' 以支持ngrok隧道功能")
 
 
+# STUN协议常量（RFC 5389）
+STUN_MAGIC_COOKIE = 0x2112A442
+STUN_BINDING_REQUEST_TYPE = 0x0001
+STUN_BINDING_SUCCESS_TYPE = 0x0101
+STUN_ATTR_XOR_MAPPED_ADDRESS = 0x0020
+STUN_FAMILY_IPV4 = 0x01
+
+# 预编译的报文结构：消息头(类型, 长度, Magic Cookie, 事务ID)、属性头(类型, 长度)、
+# XOR-MAPPED-ADDRESS的IPv4值(保留, 地址族, X-Port, X-Address)
+_STUN_HEADER = struct.Struct('!HHI12s')
+_STUN_ATTR_HEADER = struct.Struct('!HH')
+_STUN_XOR_IPV4 = struct.Struct('!BBHI')
+
+# Binding Request报文固定不变，预先构造
+STUN_BINDING_REQUEST = _STUN_HEADER.pack(
+    STUN_BINDING_REQUEST_TYPE, 0, STUN_MAGIC_COOKIE, bytes(range(12))
+)
+
+
+def parse_stun_binding_response(data: bytes) -> Tuple[Optional[str], Optional[int]]:
+    """
+    从STUN Binding Success Response中解析XOR-MAPPED-ADDRESS
+    直接在原始缓冲区上按偏移解包，不产生中间切片
+    """
+    if len(data) < _STUN_HEADER.size:
+        return None, None
+    
+    msg_type, msg_len, cookie, _ = _STUN_HEADER.unpack_from(data, 0)
+    if msg_type != STUN_BINDING_SUCCESS_TYPE or cookie != STUN_MAGIC_COOKIE:
+        return None, None
+    
+    offset = _STUN_HEADER.size
+    end = min(len(data), offset + msg_len)
+    while offset + _STUN_ATTR_HEADER.size <= end:
+        attr_type, attr_len = _STUN_ATTR_HEADER.unpack_from(data, offset)
+        value_offset = offset + _STUN_ATTR_HEADER.size
+        
+        if (attr_type == STUN_ATTR_XOR_MAPPED_ADDRESS and attr_len >= _STUN_XOR_IPV4.size
+                and value_offset + _STUN_XOR_IPV4.size <= end):
+            _, family, x_port, x_addr = _STUN_XOR_IPV4.unpack_from(data, value_offset)
+            if family == STUN_FAMILY_IPV4:
+                port = x_port ^ (STUN_MAGIC_COOKIE >> 16)
+                ip = socket.inet_ntoa(struct.pack('!I', x_addr ^ STUN_MAGIC_COOKIE))
+                return ip, port
+        
+        # 属性值需要4字节对齐
+        offset = value_offset + ((attr_len + 3) & ~3)
+    
+    return None, None
+
+
+def parse_stun_servers(entries: List[str], default_port: int = 3478) -> List[Tuple[str, int]]:
+    """将 "host:port" 形式的STUN服务器配置解析为地址列表"""
+    servers = []
+    for entry in entries:
+        host, sep, port = entry.rpartition(':')
+        if sep and port.isdigit():
+            servers.append((host, int(port)))
+        else:
+            servers.append((entry, default_port))
+    return servers
+
+
 @dataclass
 class NATResult:
     """NAT检测结果"""
@@ -34,9 +97,18 @@ class NATResult:
 class STUNClient:
     """STUN客户端实现"""
     
-    def __init__(self, stun_server: str = "stun.l.google.com", stun_port: int = 19302):
+    def __init__(self, stun_server: str = "stun.l.google.com", stun_port: int = 19302,
+                 servers: List[Tuple[str, int]] = None, cache_ttl: float = 60.0):
         self.stun_server = stun_server
         self.stun_port = stun_port
+        # 同时探测的STUN服务器列表，取最先返回的有效响应
+        self.servers = list(servers) if servers else [(stun_server, stun_port)]
+        # 外部地址缓存，有效期内不重复探测
+        self.cache_ttl = cache_ttl
+        self._cached_address: Optional[Tuple[str, int]] = None
+        self._cached_at = 0.0
+        # 主探测socket在多次探测间复用，保持同一个NAT映射
+        self._sock: Optional[socket.socket] = None
     
     def get_nat_type(self) -> NATResult:
         """检测NAT类型"""
@@ -60,53 +132,63 @@ class STUNClient:
             print(f"[!] STUN检测失败: {e}")
             return NATResult("unknown", "0.0.0.0", 0, False)
     
+    def _query_servers(self, sock: socket.socket, timeout: float = 5.0) -> Tuple[Optional[str], Optional[int]]:
+        """向所有STUN服务器同时发送请求，返回最先到达的有效响应"""
+        sent = 0
+        for server in self.servers:
+            try:
+                sock.sendto(STUN_BINDING_REQUEST, server)
+                sent += 1
+            except OSError as e:
+                print(f"[!] 向STUN服务器 {server[0]}:{server[1]} 发送请求失败: {e}")
+        if not sent:
+            return None, None
+        
+        deadline = time.monotonic() + timeout
+        # 每个服务器至多响应一次，额外留出余量丢弃无关报文
+        for _ in range(sent * 2):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, addr = sock.recvfrom(1024)
+            except socket.timeout:
+                break
+            result = parse_stun_binding_response(data)
+            if result[0]:
+                return result
+        
+        return None, None
+    
+    def _get_socket(self) -> socket.socket:
+        """获取（必要时创建）复用的UDP探测socket"""
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return self._sock
+    
+    def close(self):
+        """关闭复用的探测socket"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+    
     def _get_external_address(self) -> Tuple[Optional[str], Optional[int]]:
         """获取外部IP和端口"""
+        if self._cached_address and time.monotonic() - self._cached_at < self.cache_ttl:
+            return self._cached_address
+        
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(5)
-            
-            # STUN Binding Request
-            msg = bytearray(20)
-            msg[0:2] = struct.pack('!H', 0x0001)  # Message Type: Binding Request
-            msg[2:4] = struct.pack('!H', 0x0000)  # Message Length
-            msg[4:20] = b'\x21\x12\xA4\x42' + bytes([i for i in range(16)])  # Magic Cookie + Transaction ID
-            
-            sock.sendto(msg, (self.stun_server, self.stun_port))
-            data, addr = sock.recvfrom(1024)
-            sock.close()
+            result = self._query_servers(self._get_socket())
             
-            # 解析响应
-            if len(data) >= 20:
-                msg_type = struct.unpack('!H', data[0:2])[0]
-                if msg_type == 0x0101:  # Binding Success Response
-                    # 查找XOR-MAPPED-ADDRESS属性
-                    offset = 20
-                    while offset < len(data):
-                        if offset + 4 > len(data):
-                            break
-                        attr_type = struct.unpack('!H', data[offset:offset+2])[0]
-                        attr_len = struct.unpack('!H', data[offset+2:offset+4])[0]
-                        
-                        if attr_type == 0x0020:  # XOR-MAPPED-ADDRESS
-                            # 解析地址
-                            family = struct.unpack('!H', data[offset+6:offset+8])[0]
-                            if family == 0x01:  # IPv4
-                                port = struct.unpack('!H', data[offset+8:offset+10])[0]
-                                ip_bytes = data[offset+10:offset+14]
-                                # XOR with magic cookie
-                                magic = b'\x21\x12\xA4\x42'
-                                xor_ip = bytes([b ^ c for b, c in zip(ip_bytes, magic[:4])])
-                                ip = '.'.join(str(b) for b in xor_ip)
-                                return ip, port
-                        
-                        offset += 4 + attr_len
-                        # 属性值需要4字节对齐
-                        offset = (offset + 3) & ~3
-            
-            return None, None
+            if result[0]:
+                self._cached_address = result
+                self._cached_at = time.monotonic()
+            return result
         
         except Exception as e:
+            # socket出错后丢弃，下次探测时重新创建
+            self.close()
             print(f"[!] 获取外部地址失败: {e}")
             return None, None
     
@@ -114,44 +196,11 @@ class STUNClient:
         """使用不同端口获取外部地址"""
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.bind(('', 0))  # 绑定到随机端口
-            sock.settimeout(5)
-            
-            # STUN Binding Request
-            msg = bytearray(20)
-            msg[0:2] = struct.pack('!H', 0x0001)  # Message Type: Binding Request
-            msg[2:4] = struct.pack('!H', 0x0000)  # Message Length
-            msg[4:20] = b'\x21\x12\xA4\x42' + bytes([i for i in range(16)])  # Magic Cookie + Transaction ID
-            
-            sock.sendto(msg, (self.stun_server, self.stun_port))
-            data, addr = sock.recvfrom(1024)
-            sock.close()
-            
-            # 解析响应（与上面相同）
-            if len(data) >= 20:
-                msg_type = struct.unpack('!H', data[0:2])[0]
-                if msg_type == 0x0101:  # Binding Success Response
-                    offset = 20
-                    while offset < len(data):
-                        if offset + 4 > len(data):
-                            break
-                        attr_type = struct.unpack('!H', data[offset:offset+2])[0]
-                        attr_len = struct.unpack('!H', data[offset+2:offset+4])[0]
-                        
-                        if attr_type == 0x0020:  # XOR-MAPPED-ADDRESS
-                            family = struct.unpack('!H', data[offset+6:offset+8])[0]
-                            if family == 0x01:  # IPv4
-                                port = struct.unpack('!H', data[offset+8:offset+10])[0]
-                                ip_bytes = data[offset+10:offset+14]
-                                magic = b'\x21\x12\xA4\x42'
-                                xor_ip = bytes([b ^ c for b, c in zip(ip_bytes, magic[:4])])
-                                ip = '.'.join(str(b) for b in xor_ip)
-                                return ip, port
-                        
-                        offset += 4 + attr_len
-                        offset = (offset + 3) & ~3
-            
-            return None, None
+            try:
+                sock.bind(('', 0))  # 绑定到随机端口
+                return self._query_servers(sock)
+            finally:
+                sock.close()
         
         except Exception as e:
             print(f"[!] 使用不同端口获取外部地址失败: {e}")
@@ -285,7 +334,11 @@ class NATTraverser:
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.stun_client = STUNClient()
+        nat_config = config.get("nat_traversal", {})
+        self.stun_client = STUNClient(
+            servers=parse_stun_servers(nat_config.get("stun_servers", [])),
+            cache_ttl=nat_config.get("stun_cache_ttl", 60.0)
+        )
         self.ngrok_tunnel = NgrokTunnel()
         self.upnp_forwarder = UPnPPortForwarder()
         self.active_tunnel_url = None
@@ -296,7 +349,8 @@ class NATTraverser:
         
         # 1. 使用STUN检测NAT类型
         print("[*] 正在进行STUN检测...")
-        nat_result = self.stun_client.get_nat_type()
+        # STUN探测使用阻塞套接字，放到线程池中执行以免阻塞事件循环
+        nat_result = await asyncio.get_running_loop().run_in_executor(None, self.stun_client.get_nat_type)
         print(f"[+] NAT检测结果: 类型={nat_result.nat_type}, 外部IP={nat_result.external_ip}, 外部端口={nat_result.external_port}")
         
         # 2. 如果NAT不可穿越，尝试ngrok隧道
@@ -334,17 +388,21 @@ class NATTraverser:
     
     def cleanup(self):
         """清理资源"""
+        self.stun_client.close()
         if self.ngrok_tunnel:
             self.ngrok_tunnel.stop_tunnel()
 
 
 # 便捷函数
-async def setup_nat_traversal(config: Dict[str, Any], local_port: int) -> Tuple[bool, Optional[str], NATResult]:
+async def setup_nat_traversal(config: Dict[str, Any], local_port: int,
+                              traverser: Optional[NATTraverser] = None) -> Tuple[bool, Optional[str], NATResult]:
     """
     便捷函数：设置NAT穿越
+    传入traverser时复用其STUN探测socket和外部地址缓存，否则新建一个
     返回: (是否成功, 公共URL, NAT结果)
     """
-    traverser = NATTraverser(config)
+    if traverser is None:
+        traverser = NATTraverser(config)
     nat_result = await traverser.detect_and_traverse(local_port)
     
     success = nat_result.is_traversable
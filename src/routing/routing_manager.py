@@ -3,12 +3,20 @@
 实现更智能的路由表管理机制，包括节点健康检查、连接优化、动态更新等功能
 """
 import asyncio
+import json
+import sys
 import time
 import uuid
+from operator import attrgetter
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 
 class NodeType(Enum):
     """节点类型枚举"""
@@ -17,25 +25,81 @@ class NodeType(Enum):
     LIGHT = "light"        # 轻节点：只存储部分区块链，依赖其他节点
 
 
-@dataclass
+# 展示公钥时保留的前缀长度
+PUB_KEY_DISPLAY_LEN = 50
+
+
 class NodeInfo:
-    """节点信息数据类"""
-    node_id: str
-    host: str
-    port: int
-    pub_key: str
-    public_url: Optional[str] = None
-    node_type: NodeType = NodeType.LIGHT
-    last_seen: float = field(default_factory=time.time)
-    last_ping: float = field(default_factory=time.time)
-    ping_count: int = 0
-    ping_success: int = 0
-    connection_attempts: int = 0
-    failed_attempts: int = 0
-    reputation_score: float = 1.0  # 声誉分数，1.0为满分
-    latency: float = float('inf')  # 延迟时间（毫秒）
-    bandwidth: float = 0.0  # 带宽（Mbps）
-    is_active: bool = True  # 是否活跃
+    """节点信息"""
+    # 排序和过滤时频繁读取的字段排在前面
+    __slots__ = (
+        "reputation_score", "latency", "is_active", "node_type",
+        "ping_count", "ping_success", "last_seen", "last_ping",
+        "connection_attempts", "failed_attempts", "bandwidth",
+        "node_id", "_host", "port", "_pub_key", "pub_key_short", "public_url",
+        "route_key", "broadcast_key",
+    )
+
+    def __init__(self, node_id: str, host: str, port: int, pub_key: str,
+                 public_url: Optional[str] = None,
+                 node_type: NodeType = NodeType.LIGHT,
+                 last_seen: float = None,
+                 last_ping: float = None,
+                 ping_count: int = 0,
+                 ping_success: int = 0,
+                 connection_attempts: int = 0,
+                 failed_attempts: int = 0,
+                 reputation_score: float = 1.0,
+                 latency: float = float('inf'),
+                 bandwidth: float = 0.0,
+                 is_active: bool = True):
+        now = time.time()
+        self.node_id = node_id
+        self.host = host
+        self.port = port
+        self.pub_key = pub_key
+        self.public_url = public_url
+        self.node_type = node_type
+        self.last_seen = now if last_seen is None else last_seen
+        self.last_ping = now if last_ping is None else last_ping
+        self.ping_count = ping_count
+        self.ping_success = ping_success
+        self.connection_attempts = connection_attempts
+        self.failed_attempts = failed_attempts
+        self.reputation_score = reputation_score  # 声誉分数，1.0为满分
+        self.latency = latency  # 延迟时间（毫秒）
+        self.bandwidth = bandwidth  # 带宽（Mbps）
+        self.is_active = is_active  # 是否活跃
+        self.refresh_rank_keys()
+
+    @property
+    def host(self) -> str:
+        """节点主机地址"""
+        return self._host
+
+    @host.setter
+    def host(self, host: str):
+        """设置主机地址；大量节点共用少数主机地址，驻留后共享同一字符串对象"""
+        self._host = sys.intern(host)
+
+    @property
+    def pub_key(self) -> str:
+        """节点公钥"""
+        return self._pub_key
+
+    @pub_key.setter
+    def pub_key(self, pub_key: str):
+        """设置公钥，同时更新用于展示的截断形式"""
+        self._pub_key = pub_key
+        self.pub_key_short = pub_key[:PUB_KEY_DISPLAY_LEN] + "..." if len(pub_key) > PUB_KEY_DISPLAY_LEN else pub_key
+
+    def refresh_rank_keys(self):
+        """
+        重新计算排序键，声誉、延迟或ping统计变化后调用
+        route_key: 声誉高且延迟低的优先；broadcast_key: 声誉高且连接稳定的优先
+        """
+        self.route_key = (self.reputation_score, -self.latency)
+        self.broadcast_key = (self.reputation_score, self.ping_success / max(1, self.ping_count))
 
     def to_dict(self) -> dict:
         """转换为字典格式"""
@@ -82,6 +146,23 @@ class NodeInfo:
         )
 
 
+# NodeInfo.to_dict的字段顺序，紧凑序列化时每个节点按此顺序存为一行
+# to_bytes输出的格式标记（首字节）
+_FORMAT_JSON = b"J"
+_FORMAT_MSGPACK = b"M"
+
+_NODE_FIELDS = (
+    "node_id", "host", "port", "pub_key", "public_url", "node_type",
+    "last_seen", "last_ping", "ping_count", "ping_success",
+    "connection_attempts", "failed_attempts", "reputation_score",
+    "latency", "bandwidth", "is_active",
+)
+
+# 排序时直接读取节点上预先计算好的排序键
+_ROUTE_KEY = attrgetter("route_key")
+_BROADCAST_KEY = attrgetter("broadcast_key")
+
+
 class RoutingTableManager:
     """智能路由表管理器"""
     
@@ -96,6 +177,19 @@ class RoutingTableManager:
         # 路由表: {node_id: NodeInfo}
         self.routing_table: Dict[str, NodeInfo] = {}
         
+        # 二级索引（活跃节点、按类型分组），随路由表增量维护；
+        # 节点的 is_active / node_type 须通过管理器方法修改以保持索引一致
+        self._active_nodes: Dict[str, NodeInfo] = {}
+        self._nodes_by_type: Dict[NodeType, Dict[str, NodeInfo]] = {t: {} for t in NodeType}
+        # 按last_seen从旧到新排列的节点ID（利用dict的插入顺序），用于O(1)淘汰最旧节点
+        self._seen_order: Dict[str, None] = {}
+        
+        # 路由/广播候选排序缓存，路由表发生变化时置空，下次查询时重新排序
+        self._route_ranking: Optional[List[NodeInfo]] = None
+        self._broadcast_ranking: Optional[List[NodeInfo]] = None
+        # 路由表版本号，每次变化时递增，供调用方判断基于路由表的缓存是否过期
+        self.version = 0
+        
         # 统计信息
         self.stats = {
             "total_connections": 0,
@@ -124,16 +218,19 @@ class RoutingTableManager:
                 node_info.pub_key = pub_key
                 if public_url:
                     node_info.public_url = public_url
-                node_info.node_type = node_type
-                node_info.last_seen = time.time()
-                node_info.is_active = True
+                if node_info.node_type != node_type:
+                    del self._nodes_by_type[node_info.node_type][node_id]
+                    self._nodes_by_type[node_type][node_id] = node_info
+                    node_info.node_type = node_type
+                self._touch(node_info)
+                self._set_active(node_info, True)
             else:
                 # 添加新节点
                 if len(self.routing_table) >= self.max_nodes:
                     # 如果达到最大节点数，移除最不活跃的节点
                     self._remove_least_active_node()
                     
-                self.routing_table[node_id] = NodeInfo(
+                node_info = NodeInfo(
                     node_id=node_id,
                     host=host,
                     port=port,
@@ -141,6 +238,8 @@ class RoutingTableManager:
                     public_url=public_url,
                     node_type=node_type
                 )
+                self.routing_table[node_id] = node_info
+                self._index_node(node_info)
             
             return True
         except Exception as e:
@@ -149,10 +248,61 @@ class RoutingTableManager:
 
     def remove_node(self, node_id: str) -> bool:
         """从路由表中移除节点"""
-        if node_id in self.routing_table:
-            del self.routing_table[node_id]
-            return True
-        return False
+        node_info = self.routing_table.pop(node_id, None)
+        if node_info is None:
+            return False
+        self._unindex_node(node_info)
+        return True
+
+    def _invalidate_rankings(self):
+        """路由表变化后使排序缓存失效并递增版本号"""
+        self.version += 1
+        self._route_ranking = None
+        self._broadcast_ranking = None
+
+    def _index_node(self, node_info: NodeInfo):
+        """将节点加入二级索引"""
+        self._invalidate_rankings()
+        self._nodes_by_type[node_info.node_type][node_info.node_id] = node_info
+        self._seen_order[node_info.node_id] = None
+        if node_info.is_active:
+            self._active_nodes[node_info.node_id] = node_info
+
+    def _unindex_node(self, node_info: NodeInfo):
+        """将节点从二级索引中移除"""
+        self._invalidate_rankings()
+        self._nodes_by_type[node_info.node_type].pop(node_info.node_id, None)
+        self._seen_order.pop(node_info.node_id, None)
+        self._active_nodes.pop(node_info.node_id, None)
+
+    def _touch(self, node_info: NodeInfo):
+        """刷新节点最后活跃时间，并将其移到淘汰顺序末尾"""
+        node_info.last_seen = time.time()
+        self._seen_order.pop(node_info.node_id, None)
+        self._seen_order[node_info.node_id] = None
+
+    def _record_ping(self, node_info: NodeInfo):
+        """记录一次成功的ping；last_ping属于对外提供的节点信息，同样需要递增版本号"""
+        node_info.last_ping = time.time()
+        self._invalidate_rankings()
+
+    def _set_active(self, node_info: NodeInfo, is_active: bool):
+        """设置节点活跃状态并同步活跃索引"""
+        self._invalidate_rankings()
+        node_info.is_active = is_active
+        if is_active:
+            self._active_nodes[node_info.node_id] = node_info
+        else:
+            self._active_nodes.pop(node_info.node_id, None)
+
+    def _rebuild_indexes(self):
+        """根据路由表重建全部二级索引"""
+        self._invalidate_rankings()
+        self._active_nodes = {}
+        self._nodes_by_type = {t: {} for t in NodeType}
+        self._seen_order = {}
+        for node_info in sorted(self.routing_table.values(), key=lambda x: x.last_seen):
+            self._index_node(node_info)
 
     def get_node(self, node_id: str) -> Optional[NodeInfo]:
         """获取节点信息"""
@@ -164,24 +314,20 @@ class RoutingTableManager:
 
     def get_active_nodes(self) -> List[NodeInfo]:
         """获取活跃节点列表"""
-        return [node for node in self.routing_table.values() if node.is_active]
+        return list(self._active_nodes.values())
 
     def get_reliable_nodes(self, min_reputation: float = 0.5, 
                           max_latency: float = 500.0) -> List[NodeInfo]:
         """获取高可靠性节点（根据声誉和延迟）"""
         return [
-            node for node in self.routing_table.values()
-            if node.is_active and 
-            node.reputation_score >= min_reputation and 
+            node for node in self._active_nodes.values()
+            if node.reputation_score >= min_reputation and 
             node.latency <= max_latency
         ]
 
     def get_nodes_by_type(self, node_type: NodeType) -> List[NodeInfo]:
         """根据节点类型获取节点"""
-        return [
-            node for node in self.routing_table.values()
-            if node.node_type == node_type
-        ]
+        return list(self._nodes_by_type[node_type].values())
 
     def update_node_status(self, node_id: str, is_active: bool = None, 
                           latency: float = None, bandwidth: float = None) -> bool:
@@ -193,8 +339,8 @@ class RoutingTableManager:
             node_info = self.routing_table[node_id]
             
             if is_active is not None:
-                node_info.is_active = is_active
-                node_info.last_seen = time.time()
+                self._set_active(node_info, is_active)
+                self._touch(node_info)
                 
             if latency is not None:
                 # 更新延迟（使用移动平均）
@@ -208,6 +354,8 @@ class RoutingTableManager:
                 # 更新带宽（使用移动平均）
                 node_info.bandwidth = 0.3 * bandwidth + 0.7 * node_info.bandwidth
                 
+            node_info.refresh_rank_keys()
+            self._invalidate_rankings()
             return True
         except Exception as e:
             print(f"[!] 更新节点状态失败: {e}")
@@ -243,8 +391,10 @@ class RoutingTableManager:
                 
             # 如果声誉分数过低，标记为不活跃
             if node_info.reputation_score < 0.1:
-                node_info.is_active = False
+                self._set_active(node_info, False)
                 
+            node_info.refresh_rank_keys()
+            self._invalidate_rankings()
             return True
         except Exception as e:
             print(f"[!] 更新节点声誉失败: {e}")
@@ -252,81 +402,79 @@ class RoutingTableManager:
 
     def _remove_least_active_node(self):
         """移除最不活跃的节点"""
-        if not self.routing_table:
+        if not self._seen_order:
             return
             
-        # 按最后活跃时间排序，移除最旧的节点
-        least_active_node = min(
-            self.routing_table.values(),
-            key=lambda x: x.last_seen
-        )
-        del self.routing_table[least_active_node.node_id]
+        # 淘汰顺序的第一个即为最后活跃时间最早的节点
+        self.remove_node(next(iter(self._seen_order)))
 
     def cleanup_inactive_nodes(self):
         """清理不活跃节点"""
         current_time = time.time()
         inactive_nodes = []
         
-        for node_id, node_info in self.routing_table.items():
-            # 如果节点超过30分钟没有活动，标记为不活跃
-            if current_time - node_info.last_seen > 1800:  # 30分钟
-                inactive_nodes.append(node_id)
+        # 从最旧的节点开始检查，遇到30分钟内活跃过的节点即可停止
+        for node_id in self._seen_order:
+            if current_time - self.routing_table[node_id].last_seen <= 1800:  # 30分钟
+                break
+            inactive_nodes.append(node_id)
                 
         for node_id in inactive_nodes:
-            self.routing_table[node_id].is_active = False
+            self._set_active(self.routing_table[node_id], False)
 
     def get_optimal_route(self, target_node_id: str, 
                          exclude_nodes: List[str] = None) -> Optional[NodeInfo]:
         """获取到目标节点的最优路由"""
-        if exclude_nodes is None:
-            exclude_nodes = []
-            
-        # 优先选择声誉高、延迟低的活跃节点
-        candidates = [
-            node for node in self.routing_table.values()
-            if node.node_id != target_node_id and 
-            node.node_id not in exclude_nodes and 
-            node.is_active
-        ]
-        
-        if not candidates:
-            return None
-            
-        # 按声誉分数和延迟排序（声誉高且延迟低的优先）
-        candidates.sort(
-            key=lambda x: (x.reputation_score, -x.latency), 
-            reverse=True
-        )
+        # 优先选择声誉高、延迟低的活跃节点（声誉高且延迟低的优先）
+        if self._route_ranking is None:
+            self._route_ranking = sorted(
+                self._active_nodes.values(), key=_ROUTE_KEY, reverse=True
+            )
         
-        return candidates[0] if candidates else None
+        excluded = set(exclude_nodes) if exclude_nodes else ()
+        # 排序稳定，跳过目标和排除节点后的第一个即为过滤后排序的第一个
+        for node in self._route_ranking:
+            if node.node_id != target_node_id and node.node_id not in excluded:
+                return node
+        return None
 
     def get_best_nodes_for_broadcast(self, count: int = 5) -> List[NodeInfo]:
         """获取最适合广播的节点（声誉高、连接稳定的节点）"""
-        all_nodes = self.get_active_nodes()
-        
         # 按声誉分数和连接稳定性排序
-        all_nodes.sort(
-            key=lambda x: (x.reputation_score, x.ping_success / max(1, x.ping_count)), 
-            reverse=True
-        )
+        if self._broadcast_ranking is None:
+            self._broadcast_ranking = sorted(
+                self._active_nodes.values(), key=_BROADCAST_KEY, reverse=True
+            )
         
-        return all_nodes[:min(count, len(all_nodes))]
+        ranking = self._broadcast_ranking
+        return ranking[:min(count, len(ranking))]
 
     def get_routing_stats(self) -> dict:
-        """获取路由表统计信息"""
-        active_nodes = self.get_active_nodes()
-        full_nodes = self.get_nodes_by_type(NodeType.FULL)
-        relay_nodes = self.get_nodes_by_type(NodeType.RELAY)
-        light_nodes = self.get_nodes_by_type(NodeType.LIGHT)
+        """获取路由表统计信息（单次遍历路由表完成所有统计）"""
+        type_counts = {NodeType.FULL: 0, NodeType.RELAY: 0, NodeType.LIGHT: 0}
+        active_count = 0
+        reputation_sum = 0.0
+        latency_sum = 0.0
+        latency_count = 0
+        inf = float('inf')
+        
+        for node in self.routing_table.values():
+            type_counts[node.node_type] += 1
+            if node.is_active:
+                active_count += 1
+                reputation_sum += node.reputation_score
+                if node.latency != inf:
+                    latency_sum += node.latency
+                    latency_count += 1
         
         return {
             "total_nodes": len(self.routing_table),
-            "active_nodes": len(active_nodes),
-            "full_nodes": len(full_nodes),
-            "relay_nodes": len(relay_nodes),
-            "light_nodes": len(light_nodes),
-            "avg_reputation": sum(node.reputation_score for node in active_nodes) / max(1, len(active_nodes)),
-            "avg_latency": sum(node.latency for node in active_nodes if node.latency != float('inf')) / max(1, len([n for n in active_nodes if n.latency != float('inf')])),
+            "active_nodes": active_count,
+            "full_nodes": type_counts[NodeType.FULL],
+            "relay_nodes": type_counts[NodeType.RELAY],
+            "light_nodes": type_counts[NodeType.LIGHT],
+            "avg_reputation": reputation_sum / max(1, active_count),
+            "avg_latency": latency_sum / max(1, latency_count),
             "stats": self.stats
         }
 
@@ -376,7 +524,7 @@ class RoutingTableManager:
             success = await self._ping_node(node)
             self.update_node_reputation(node.node_id, success)
             if success:
-                node.last_ping = time.time()
+                self._record_ping(node)
 
     async def _ping_node(self, node_info: NodeInfo) -> bool:
         """尝试连接节点以测试其可用性"""
@@ -444,5 +592,42 @@ class RoutingTableManager:
             node_id: NodeInfo.from_dict(node_data)
             for node_id, node_data in data["routing_table"].items()
         }
+        manager._rebuild_indexes()
         manager.stats = data.get("stats", {})
-        return manager
\ No newline at end of file
+        return manager
+
+    def to_bytes(self) -> bytes:
+        """
+        序列化为紧凑的二进制格式以便存储或传输
+        字段名只写一次，每个节点按字段顺序存为一行；安装msgpack时使用msgpack，否则回退到JSON
+        首字节为格式标记，读取方据此选择解码方式
+        """
+        rows = [list(node_info.to_dict().values()) for node_info in self.routing_table.values()]
+        payload = {
+            "local_node_id": self.local_node_id,
+            "fields": _NODE_FIELDS,
+            "nodes": rows,
+            "stats": self.stats
+        }
+        if MSGPACK_AVAILABLE:
+            return _FORMAT_MSGPACK + msgpack.packb(payload, use_bin_type=True)
+        return _FORMAT_JSON + json.dumps(payload, separators=(',', ':')).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """从to_bytes的输出恢复路由表"""
+        tag, body = data[:1], data[1:]
+        if tag == _FORMAT_JSON:
+            payload = json.loads(body)
+        elif tag == _FORMAT_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("路由表数据为msgpack格式，需要安装msgpack才能读取")
+            payload = msgpack.unpackb(body, raw=False)
+        else:
+            raise ValueError(f"未知的路由表数据格式: {tag!r}")
+        fields = payload["fields"]
+        return cls.from_dict({
+            "local_node_id": payload["local_node_id"],
+            "routing_table": {row[0]: dict(zip(fields, row)) for row in payload["nodes"]},
+            "stats": payload.get("stats", {})
+        })
\ No newline at end of file
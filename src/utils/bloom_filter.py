@@ -0,0 +1,47 @@
+"""
+布隆过滤器
+用于快速判断元素“一定不存在”，以少量内存换取免去代价较高的精确查找
+"""
+import hashlib
+import math
+from typing import List, Union
+
+
+class BloomFilter:
+    """布隆过滤器（可能误报，不会漏报）"""
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity  # 预期元素数量
+        self.error_rate = error_rate  # 预期误报率
+        # 根据容量和误报率计算位数组大小与哈希函数个数
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0  # 已添加的元素数量
+
+    def _positions(self, item: Union[str, bytes]) -> List[int]:
+        """计算元素对应的位位置（双重哈希）"""
+        if isinstance(item, str):
+            item = item.encode()
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.num_hashes)]
+
+    def add(self, item: Union[str, bytes]):
+        """添加元素"""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: Union[str, bytes]) -> bool:
+        """判断元素是否可能存在"""
+        bits = self.bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def clear(self):
+        """清空过滤器"""
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
@@ -3,13 +3,133 @@
 用于增加计算延迟以防止垃圾信息和增强安全性
 """
 import hashlib
+import multiprocessing
+import os
+import struct
 import time
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 import threading
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from src.blockchain.block import Block
+from src.utils.bloom_filter import BloomFilter
+from ._vdf_numba import NUMBA_AVAILABLE, hash_chain_from_digest, hash_chains_from_digests, warmup
+
+try:
+    import gmpy2
+    GMPY2_AVAILABLE = True
+except ImportError:
+    GMPY2_AVAILABLE = False
+
+# 模幂运算：优先使用GMP实现，未安装gmpy2时回退到内置pow
+powmod = gmpy2.powmod if GMPY2_AVAILABLE else pow
+
+# 批量验证的总迭代次数超过该阈值时才启用多进程，避免小批量时进程启动开销大于收益
+PARALLEL_VERIFY_THRESHOLD = 200000
+
+# 迭代次数相同的链至少有这么多条时才使用多缓冲区内核；
+# 链数较少时SIMD向量填不满，逐条计算反而更快
+MULTI_BUFFER_MIN_CHAINS = 16
+
+# 异步计算共用的线程池，避免每次调用都创建和销毁线程
+_VDF_POOL = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="vdf"
+)
+
+# 并行验证共用的进程池，首次需要时才创建，避免每次批量验证都重新启动工作进程
+_VERIFY_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+_VERIFY_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    获取（必要时创建）共用的验证进程池
+    调用方进程中已有线程池和事件循环，fork多线程进程可能使子进程死锁，因此以spawn方式启动工作进程
+    """
+    global _VERIFY_PROCESS_POOL
+    with _VERIFY_PROCESS_POOL_LOCK:
+        if _VERIFY_PROCESS_POOL is None:
+            _VERIFY_PROCESS_POOL = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        return _VERIFY_PROCESS_POOL
+
+
+def shutdown_verify_pool():
+    """关闭共用的验证进程池（节点或控制台退出时调用），之后再次需要时会重新创建"""
+    global _VERIFY_PROCESS_POOL
+    with _VERIFY_PROCESS_POOL_LOCK:
+        pool, _VERIFY_PROCESS_POOL = _VERIFY_PROCESS_POOL, None
+    if pool is not None:
+        pool.shutdown()
+
+
+# 哈希链计数器的编码格式（8字节小端）
+_COUNTER = struct.Struct('<Q')
+# 已初始化的SHA-256哈希对象模板
+_SHA256_TEMPLATE = hashlib.sha256()
+
+
+def _hash_chain(challenge: str, iterations: int) -> str:
+    """
+    执行VDF的顺序哈希链
+    compute/verify/compute_with_witness共用的内层循环，局部绑定避免每轮的属性查找
+    链内直接传递32字节原始摘要并以8字节小端计数器作为后缀，只在结束时转换一次十六进制
+    除首轮外每轮输入固定为40字节，恰好填充为一个SHA-256分组，
+    hashlib底层的OpenSSL会在支持SHA-NI的CPU上自动使用硬件指令完成这一次压缩
+    """
+    result = challenge.encode()
+    if NUMBA_AVAILABLE and iterations > 1:
+        # 首轮输入长度不定，用hashlib计算；之后每轮都是单分组，交给编译后的哈希链
+        result = hashlib.sha256(result + _COUNTER.pack(0)).digest()
+        return hash_chain_from_digest(result, 1, iterations - 1).hex()
+    # 从预先初始化的哈希对象复制，省去每轮新建哈希器的初始化开销
+    new_hasher = _SHA256_TEMPLATE.copy
+    pack_counter = _COUNTER.pack
+    for i in range(iterations):
+        h = new_hasher()
+        h.update(result)
+        h.update(pack_counter(i))
+        result = h.digest()
+    return result.hex()
+
+
+def _hash_chain_group(challenges: List[str], iterations: int) -> List[str]:
+    """
+    用多缓冲区内核同时计算多条迭代次数相同的哈希链
+    """
+    pack_counter = _COUNTER.pack
+    digests = [hashlib.sha256(c.encode() + pack_counter(0)).digest() for c in challenges]
+    return [d.hex() for d in hash_chains_from_digests(digests, 1, iterations - 1)]
+
+
+def _hash_chains(challenges: List[str], iterations: List[int]) -> List[str]:
+    """
+    计算多条相互独立的哈希链
+    总计算量足够大时分发到多个进程并行计算；否则顺序计算，
+    安装numba时把迭代次数相同且数量足够多的链合并交给多缓冲区内核
+    """
+    if len(challenges) > 1 and sum(iterations) >= PARALLEL_VERIFY_THRESHOLD:
+        return list(_get_process_pool().map(_hash_chain, challenges, iterations))
+    if not NUMBA_AVAILABLE or len(challenges) < MULTI_BUFFER_MIN_CHAINS:
+        return [_hash_chain(c, n) for c, n in zip(challenges, iterations)]
+
+    results = [None] * len(challenges)
+    groups = {}  # 迭代次数 -> 链下标列表
+    for idx, n in enumerate(iterations):
+        if n > 1:
+            groups.setdefault(n, []).append(idx)
+        else:
+            results[idx] = _hash_chain(challenges[idx], n)
+    for n, indices in groups.items():
+        if len(indices) >= MULTI_BUFFER_MIN_CHAINS:
+            group_results = _hash_chain_group([challenges[idx] for idx in indices], n)
+        else:
+            group_results = [_hash_chain(challenges[idx], n) for idx in indices]
+        for idx, result in zip(indices, group_results):
+            results[idx] = result
+    return results
 
 
 class VDF:
@@ -26,11 +146,9 @@ class VDF:
         返回证明和计算时间
         """
         start_time = time.time()
-        result = challenge
         
         # 执行预定义数量的哈希计算
-        for i in range(self.difficulty):
-            result = hashlib.sha256((result + str(i)).encode()).hexdigest()
+        result = _hash_chain(challenge, self.difficulty)
         
         computation_time = time.time() - start_time
         return result, computation_time
@@ -39,38 +157,50 @@ class VDF:
         """
         异步计算VDF证明
         """
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            result, computation_time = await loop.run_in_executor(
-                executor, self.compute, challenge
-            )
-        return result, computation_time
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_VDF_POOL, self.compute, challenge)
 
-    def verify(self, challenge: str, proof: str, expected_iterations: Optional[int] = None) -> bool:
+    def verify(self, challenge: str, proof: str, expected_iterations: Optional[int] = None,
+               witness: Optional[str] = None) -> bool:
         """
         验证VDF证明
-        验证速度应该远快于计算速度
+        哈希链方案只能重新计算整条链，witness参数仅为与WesolowskiVDF接口一致而保留
         """
         if expected_iterations is None:
             expected_iterations = self.difficulty
             
         # 重新计算相同的迭代次数来验证证明
-        result = challenge
-        for i in range(expected_iterations):
-            result = hashlib.sha256((result + str(i)).encode()).hexdigest()
+        return _hash_chain(challenge, expected_iterations) == proof
+
+    def verify_batch(self, items: List[Tuple[str, str, Optional[int]]]) -> List[bool]:
+        """
+        批量验证多个VDF证明
+        items为(challenge, proof, expected_iterations)列表，返回逐项的验证结果
+        每条哈希链内部是顺序的，但不同链之间相互独立，可以并行计算
+        """
+        challenges = [challenge for challenge, _, _ in items]
+        iterations = [
+            expected_iterations if expected_iterations is not None else self.difficulty
+            for _, _, expected_iterations in items
+        ]
         
-        return result == proof
+        results = _hash_chains(challenges, iterations)
+        return [result == proof for result, (_, proof, _) in zip(results, items)]
+
+    def compute_batch(self, challenges: List[str]) -> List[str]:
+        """
+        批量计算多个相互独立挑战的VDF证明
+        """
+        return _hash_chains(challenges, [self.difficulty] * len(challenges))
 
     def compute_with_witness(self, challenge: str) -> Tuple[str, str, float]:
         """
         计算VDF证明并生成见证（用于快速验证）
         """
         start_time = time.time()
-        result = challenge
         
         # 执行预定义数量的哈希计算
-        for i in range(self.difficulty):
-            result = hashlib.sha256((result + str(i)).encode()).hexdigest()
+        result = _hash_chain(challenge, self.difficulty)
         
         computation_time = time.time() - start_time
         
@@ -80,18 +210,184 @@ class VDF:
         return result, witness, computation_time
 
 
+# Wesolowski VDF使用的2048位RSA模数：RSA Laboratories公布的RSA-2048挑战数
+# 该数由RSA Laboratories于1991年公开，至今无人公开其因子分解；
+# 若模数的因子已知，即可绕过顺序平方直接算出 g^(2^T)，VDF将失去延迟保证
+WESOLOWSKI_MODULUS = int(
+    "c7970ceedcc3b0754490201a7aa613cd73911081c790f5f1a8726f463550bb5b"
+    "7ff0db8e1ea1189ec72f93d1650011bd721aeeacc2acde32a04107f0648c2813"
+    "a31f5b0b7765ff8b44b4b6ffc93384b646eb09c7cf5e8592d40ea33c80039f35"
+    "b4f14a04b51f7bfd781be4d1673164ba8eb991c2c4d730bbbe35f592bdef524a"
+    "f7e8daefd26c66fc02c479af89d64d373f442709439de66ceb955f3ea37d5159"
+    "f6135809f85334b5cb1813addc80cd05609f10ac6a95ad65872c909525bdad32"
+    "bc729592642920f24c61dc5b3c3b7923e56b16a4d9d373d8721f24a3fc0f1b31"
+    "31f55615172866bccc30f95054c824e733a5eb6817f7bc16399d48c6361cc7e5",
+    16
+)
+
+# Miller-Rabin素性测试使用的底数
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71)
+
+
+def _is_probable_prime(n: int) -> bool:
+    """Miller-Rabin素性测试"""
+    if n < 2:
+        return False
+    for p in _MR_BASES:
+        if n % p == 0:
+            return n == p
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for a in _MR_BASES:
+        x = powmod(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _hash_to_prime(*values: int) -> int:
+    """将若干整数哈希为一个128位素数（Fiat-Shamir挑战）"""
+    h = hashlib.sha256()
+    for v in values:
+        h.update(v.to_bytes((v.bit_length() + 7) // 8 or 1, 'big'))
+        h.update(b"|")
+    candidate = int.from_bytes(h.digest()[:16], 'big') | (1 << 127) | 1
+    while not _is_probable_prime(candidate):
+        candidate += 2
+    return candidate
+
+
+class WesolowskiVDF:
+    """
+    Wesolowski可验证延迟函数
+    在未知阶的RSA群中计算 y = g^(2^T) mod N，需要T次顺序平方；
+    证明 π = g^floor(2^T / l) mod N，验证只需检查 π^l * g^(2^T mod l) ≡ y，
+    与T无关，远快于重新计算
+    """
+    def __init__(self, difficulty: int = 10000, modulus: int = WESOLOWSKI_MODULUS):
+        self.difficulty = difficulty  # 顺序平方次数T
+        self.modulus = modulus
+
+    def _challenge_to_group(self, challenge: str) -> int:
+        """将挑战哈希为群元素g"""
+        g = int.from_bytes(hashlib.sha256(challenge.encode()).digest(), 'big') % self.modulus
+        return g if g > 1 else 2
+
+    def _evaluate(self, challenge: str, iterations: int) -> Tuple[int, int]:
+        """计算 g 和 y = g^(2^T) mod N"""
+        g = self._challenge_to_group(challenge)
+        y = powmod(g, 1 << iterations, self.modulus)
+        return g, y
+
+    def compute(self, challenge: str) -> Tuple[str, float]:
+        """
+        计算VDF输出
+        返回输出和计算时间
+        """
+        start_time = time.time()
+        _, y = self._evaluate(challenge, self.difficulty)
+        return format(y, 'x'), time.time() - start_time
+
+    def compute_with_witness(self, challenge: str) -> Tuple[str, str, float]:
+        """
+        计算VDF输出及Wesolowski证明π（作为见证）
+        """
+        start_time = time.time()
+        g, y = self._evaluate(challenge, self.difficulty)
+        l = _hash_to_prime(g, y)
+        pi = powmod(g, (1 << self.difficulty) // l, self.modulus)
+        return format(y, 'x'), format(pi, 'x'), time.time() - start_time
+
+    def verify(self, challenge: str, proof: str, expected_iterations: Optional[int] = None,
+               witness: Optional[str] = None) -> bool:
+        """
+        验证VDF输出
+        提供见证π时只需两次小指数模幂；未提供时退化为重新计算
+        """
+        if expected_iterations is None:
+            expected_iterations = self.difficulty
+        try:
+            y = int(proof, 16)
+            if witness is None:
+                return self._evaluate(challenge, expected_iterations)[1] == y
+            pi = int(witness, 16)
+        except (TypeError, ValueError):
+            return False
+        if not (0 < y < self.modulus and 0 < pi < self.modulus):
+            return False
+
+        g = self._challenge_to_group(challenge)
+        l = _hash_to_prime(g, y)
+        r = powmod(2, expected_iterations, l)
+        return powmod(pi, l, self.modulus) * powmod(g, r, self.modulus) % self.modulus == y
+
+
+def _challenge_cache_key(challenge: str) -> bytes:
+    """
+    计算挑战的缓存键
+    使用16字节的blake2b原始摘要，比SHA-256十六进制字符串更快、更省内存
+    """
+    return hashlib.blake2b(challenge.encode(), digest_size=16).digest()
+
+
 class VDFProof:
     """
     VDF证明对象
     """
+    # 挑战、证明值和难度决定证明的身份（相等与哈希），创建后只读，避免放入集合或用作字典键后被修改
+    __slots__ = ("_challenge", "_proof", "witness", "computation_time", "_difficulty", "timestamp", "_cache_key")
+
     def __init__(self, challenge: str, proof: str, witness: str = None, 
                  computation_time: float = 0.0, difficulty: int = 10000):
-        self.challenge = challenge
-        self.proof = proof
+        self._challenge = challenge
+        self._proof = proof
         self.witness = witness
         self.computation_time = computation_time
-        self.difficulty = difficulty
+        self._difficulty = difficulty
         self.timestamp = time.time()
+        self._cache_key = None
+
+    @property
+    def challenge(self) -> str:
+        """挑战（只读）"""
+        return self._challenge
+
+    @property
+    def proof(self) -> str:
+        """证明值（只读）"""
+        return self._proof
+
+    @property
+    def difficulty(self) -> int:
+        """证明声明的难度（只读）"""
+        return self._difficulty
+
+    @property
+    def cache_key(self) -> bytes:
+        """挑战的缓存键，首次访问时计算并保存在对象上"""
+        if self._cache_key is None:
+            self._cache_key = _challenge_cache_key(self.challenge)
+        return self._cache_key
+
+    def _identity(self) -> Tuple[str, str, int]:
+        """证明的身份字段：挑战、证明值和难度相同即视为同一证明"""
+        return (self.challenge, self.proof, self.difficulty)
+
+    def __eq__(self, other):
+        if not isinstance(other, VDFProof):
+            return NotImplemented
+        return self._identity() == other._identity()
+
+    def __hash__(self):
+        return hash(self._identity())
 
     def to_dict(self) -> dict:
         """转换为字典格式"""
@@ -116,15 +412,62 @@ class VDFProof:
         )
 
 
+# 可选的VDF方案
+VDF_SCHEMES = {
+    "hash_chain": VDF,
+    "wesolowski": WesolowskiVDF,
+}
+
+
 class VDFManager:
     """
     VDF管理器
     用于管理VDF计算和验证
     """
-    def __init__(self, difficulty: int = 10000):
-        self.vdf = VDF(difficulty)
+    def __init__(self, difficulty: int = 10000, scheme: str = "hash_chain", max_cache_size: int = 1024):
+        self.vdf = VDF_SCHEMES[scheme](difficulty)
         self.difficulty = difficulty
-        self.proof_cache = {}  # 缓存证明以避免重复计算
+        self.max_cache_size = max_cache_size
+        self.proof_cache = OrderedDict()  # 缓存证明以避免重复计算，按最近使用顺序排列
+        self.seen_bloom = BloomFilter(capacity=100000, error_rate=1e-4)  # 已验证(挑战, 证明, 难度)的快速预筛
+
+    @staticmethod
+    def _cache_key(challenge: str) -> bytes:
+        """计算挑战的缓存键（已有VDFProof对象时直接使用其cache_key属性）"""
+        return _challenge_cache_key(challenge)
+
+    @staticmethod
+    def _seen_key(vdf_proof: VDFProof) -> bytes:
+        """计算(挑战, 证明, 难度)在布隆过滤器中的键"""
+        return hashlib.blake2b(
+            f"{vdf_proof.challenge}:{vdf_proof.proof}:{vdf_proof.difficulty}".encode(), digest_size=16
+        ).digest()
+
+    def _remember(self, vdf_proof: VDFProof):
+        """记录一个有效的证明到缓存和布隆过滤器"""
+        cache_key = vdf_proof.cache_key
+        self.proof_cache[cache_key] = vdf_proof
+        self.proof_cache.move_to_end(cache_key)
+        # 超出容量时淘汰最久未使用的证明（布隆过滤器中的记录保留，仅会导致一次额外的精确比对）
+        while len(self.proof_cache) > self.max_cache_size:
+            self.proof_cache.popitem(last=False)
+        self.seen_bloom.add(self._seen_key(vdf_proof))
+
+    def _cached_hit(self, vdf_proof: VDFProof) -> bool:
+        """
+        判断证明是否已按相同难度验证过，命中时刷新其最近使用位置
+        难度由证明方声明，低难度下验证通过的证明不能当作高难度的证明
+        """
+        # 布隆过滤器未命中则一定没有验证过，无需再查缓存
+        if self._seen_key(vdf_proof) not in self.seen_bloom:
+            return False
+        cache_key = vdf_proof.cache_key
+        cached_proof = self.proof_cache.get(cache_key)
+        if (cached_proof is None or cached_proof.proof != vdf_proof.proof
+                or cached_proof.difficulty != vdf_proof.difficulty):
+            return False
+        self.proof_cache.move_to_end(cache_key)
+        return True
 
     async def generate_proof(self, challenge: str) -> VDFProof:
         """
@@ -141,8 +484,7 @@ class VDFManager:
         )
         
         # 缓存证明
-        cache_key = hashlib.sha256(challenge.encode()).hexdigest()
-        self.proof_cache[cache_key] = vdf_proof
+        self._remember(vdf_proof)
         
         return vdf_proof
 
@@ -150,26 +492,66 @@ class VDFManager:
         """
         验证VDF证明
         """
-        # 检查是否在缓存中
-        cache_key = hashlib.sha256(vdf_proof.challenge.encode()).hexdigest()
-        if cache_key in self.proof_cache:
-            cached_proof = self.proof_cache[cache_key]
-            if cached_proof.proof == vdf_proof.proof:
-                return True
+        if self._cached_hit(vdf_proof):
+            return True
         
         # 验证证明
-        return self.vdf.verify(
+        is_valid = self.vdf.verify(
             vdf_proof.challenge, 
             vdf_proof.proof, 
-            vdf_proof.difficulty
+            vdf_proof.difficulty,
+            vdf_proof.witness
         )
+        
+        # 缓存验证通过的证明，重复收到时无需再次计算哈希链
+        if is_valid:
+            self._remember(vdf_proof)
+        
+        return is_valid
+
+    def verify_proofs_batch(self, proofs: List[VDFProof]) -> List[bool]:
+        """
+        批量验证多个VDF证明，返回逐项的验证结果
+        已缓存的证明直接命中；其余证明在哈希链方案下交给verify_batch统一计算
+        """
+        results = [False] * len(proofs)
+        pending = []  # 未命中缓存、需要计算的证明下标
+        first_seen = {}  # 证明 -> 首次出现的下标，重复的证明只计算一次
+        duplicates = []  # (重复证明下标, 首次出现下标)
+        for idx, vdf_proof in enumerate(proofs):
+            first = first_seen.setdefault(vdf_proof, idx)
+            if first != idx:
+                duplicates.append((idx, first))
+            elif self._cached_hit(vdf_proof):
+                results[idx] = True
+            else:
+                pending.append(idx)
+
+        if isinstance(self.vdf, VDF):
+            verified = self.vdf.verify_batch([
+                (proofs[idx].challenge, proofs[idx].proof, proofs[idx].difficulty)
+                for idx in pending
+            ])
+        else:
+            verified = [
+                self.vdf.verify(proofs[idx].challenge, proofs[idx].proof,
+                                proofs[idx].difficulty, proofs[idx].witness)
+                for idx in pending
+            ]
+
+        for idx, is_valid in zip(pending, verified):
+            results[idx] = is_valid
+            if is_valid:
+                self._remember(proofs[idx])
+        for idx, first in duplicates:
+            results[idx] = results[first]
+        return results
 
     def add_proof_to_cache(self, vdf_proof: VDFProof):
         """
         将证明添加到缓存
         """
-        cache_key = hashlib.sha256(vdf_proof.challenge.encode()).hexdigest()
-        self.proof_cache[cache_key] = vdf_proof
+        self._remember(vdf_proof)
 
     def cleanup_cache(self, max_age: float = 3600):
         """
@@ -195,6 +577,9 @@ class VDFBlockchain:
         self.blockchain = Blockchain()
         self.vdf_manager = VDFManager(vdf_difficulty)
         self.blockchain.difficulty = difficulty
+        # 已通过VDF验证的区块哈希；区块哈希覆盖了重建挑战所需的全部字段，
+        # 哈希未变即可跳过重复的哈希链验证
+        self.verified_vdf_blocks = set()
 
     async def add_block_with_vdf(self, data: str, proposer: str = None) -> bool:
         """
@@ -222,9 +607,10 @@ class VDFBlockchain:
         # 将VDF证明添加到区块数据中，但保留原始数据供验证
         new_block.data = f"VDF:{vdf_proof.proof}:{data}"
         
-        # 验证VDF证明
-        if not self.vdf_manager.verify_proof(vdf_proof):
-            print("[!] VDF证明验证失败")
+        # 证明刚由本节点计算得出，只做格式检查，无需重算整条哈希链；
+        # 完整校验由verify_blockchain_with_vdf在链级别完成
+        if len(vdf_proof.proof) != 64:
+            print("[!] VDF证明格式无效")
             return False
         
         # 添加区块到链
@@ -237,41 +623,64 @@ class VDFBlockchain:
         """
         from ..blockchain.block import Block
         
+        vdf_blocks = []  # (区块索引, 挑战, 证明, 区块哈希)
         for i in range(1, len(self.blockchain.chain)):
             current_block = self.blockchain.chain[i]
             previous_block = self.blockchain.chain[i-1]
 
             # 检查当前区块哈希是否正确
-            if current_block.hash != current_block.calculate_hash():
+            block_hash = current_block.calculate_hash()
+            if current_block.hash != block_hash:
                 return False
 
             # 检查当前区块的前一个哈希是否与上一个区块的哈希匹配
             if current_block.previous_hash != previous_block.hash:
                 return False
 
-            # 如果区块数据包含VDF证明，验证它
-            if current_block.data.startswith("VDF:"):
-                try:
-                    parts = current_block.data.split(":", 2)
-                    if len(parts) >= 3:
-                        vdf_proof_str = parts[1]
-                        original_data = parts[2]
-                        
-                        # 重建挑战 - 使用原始数据和之前区块的哈希
-                        # 生成VDF证明时，挑战是基于 previous_hash, timestamp, data
-                        challenge = f"{previous_block.hash}{current_block.timestamp}{original_data}"
-                        
-                        # 验证VDF证明
-                        if not self.vdf_manager.vdf.verify(challenge, vdf_proof_str):
-                            print(f"[!] 区块 {i} 的VDF证明验证失败")
-                            return False
-                except Exception as e:
-                    print(f"[!] 区块 {i} 的VDF证明验证出错: {e}")
-                    # 如果解析失败，继续验证其他部分
-                    continue
+            # 之前已验证过的区块无需重新计算VDF
+            if block_hash in self.verified_vdf_blocks:
+                continue
 
+            # 如果区块数据包含VDF证明，收集起来统一批量验证
+            data = current_block.data
+            if data.startswith("VDF:"):
+                # 数据格式为 "VDF:<64位十六进制证明>:<原始数据>"，按固定宽度切片，无需split
+                if data[68:69] == ":":
+                    vdf_proof_str = data[4:68]
+                    original_data = data[69:]
+                else:
+                    vdf_proof_str, sep, original_data = data[4:].partition(":")
+                    if not sep:
+                        print(f"[!] 区块 {i} 的VDF证明格式无效")
+                        # 如果解析失败，继续验证其他部分
+                        continue
+                
+                # 重建挑战 - 使用原始数据和之前区块的哈希
+                # 生成VDF证明时，挑战是基于 previous_hash, timestamp, data
+                challenge = f"{previous_block.hash}{current_block.timestamp}{original_data}"
+                vdf_blocks.append((i, challenge, vdf_proof_str, block_hash))
+
+        # 批量验证所有VDF证明
+        results = self.vdf_manager.verify_proofs_batch([
+            VDFProof(challenge=challenge, proof=proof, difficulty=self.vdf_manager.difficulty)
+            for _, challenge, proof, _ in vdf_blocks
+        ])
+        for (i, _, _, _), is_valid in zip(vdf_blocks, results):
+            if not is_valid:
+                print(f"[!] 区块 {i} 的VDF证明验证失败")
+                return False
+
+        self.verified_vdf_blocks.update(block_hash for _, _, _, block_hash in vdf_blocks)
         return True
 
+    async def verify_blockchain_with_vdf_async(self) -> bool:
+        """
+        异步验证包含VDF证明的区块链
+        整条链的验证放到线程池中执行，不阻塞事件循环；各区块的哈希链仍按总计算量决定是否分发到进程池
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_VDF_POOL, self.verify_blockchain_with_vdf)
+
     def get_blockchain_info(self):
         """
         获取区块链信息
@@ -3,16 +3,62 @@
 用于增强隐私保护，允许验证某些信息而不泄露信息本身
 """
 import hashlib
+import heapq
+import hmac
 import secrets
 import json
 import time
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
+from functools import lru_cache
+
+try:
+    import gmpy2
+    GMPY2_AVAILABLE = True
+except ImportError:
+    GMPY2_AVAILABLE = False
+
+# 模幂运算：优先使用GMP实现，未安装gmpy2时回退到内置pow
+powmod = gmpy2.powmod if GMPY2_AVAILABLE else pow
+
+# 固定底数幂运算的窗口宽度（比特）
+WINDOW_BITS = 8
+
+# Fiat-Shamir挑战的域分隔标签
+FIAT_SHAMIR_DOMAIN = b"ZKP|schnorr|v1|"
+# 已吸收域分隔标签的哈希状态，每次计算挑战时复制后继续写入
+_FIAT_SHAMIR_HASHER = hashlib.sha256(FIAT_SHAMIR_DOMAIN)
+
+
+def serialize_public_data(public_data: Optional[Dict[str, Any]]) -> bytes:
+    """将公共数据序列化为规范的JSON字节串（键排序），供挑战和证明ID计算复用"""
+    return json.dumps(public_data or {}, sort_keys=True).encode()
+
+
+@lru_cache(maxsize=None)
+def _build_g_table(g: int, p: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    预计算固定底数g的窗口表
+    第i行第k项为 g^(k * 2^(i*WINDOW_BITS)) mod p
+    表只依赖(g, p)，按参数缓存后所有生成器实例共用同一张只读表
+    """
+    window_size = 1 << WINDOW_BITS
+    num_windows = -(-(p - 1).bit_length() // WINDOW_BITS)
+    table = []
+    for i in range(num_windows):
+        base = pow(g, 1 << (WINDOW_BITS * i), p)
+        row = [1]
+        for _ in range(window_size - 1):
+            row.append(row[-1] * base % p)
+        table.append(tuple(row))
+    return tuple(table)
 
 
 @dataclass
 class ZKPProof:
     """零知识证明数据结构"""
+    __slots__ = ("statement", "witness", "challenge", "response", "public_data")
+
     statement: str  # 声明
     witness: str    # 证人（秘密值）
     challenge: str  # 挑战
@@ -29,6 +75,14 @@ class ZKPProof:
             "public_data": self.public_data
         }
 
+    def canonical_bytes(self) -> bytes:
+        """规范化的字节串表示（键排序的JSON），用于比较和哈希"""
+        return json.dumps(self.to_dict(), sort_keys=True).encode()
+
+    def ct_equal(self, other: "ZKPProof") -> bool:
+        """以恒定时间比较两个证明，比较耗时不随首个不同字节的位置变化"""
+        return hmac.compare_digest(self.canonical_bytes(), other.canonical_bytes())
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
         """从字典创建ZKPProof对象"""
@@ -41,6 +95,16 @@ class ZKPProof:
         )
 
 
+@dataclass
+class ZKPRecord:
+    """证明存储记录：证明本身、创建时间戳及公共数据的序列化结果放在一起"""
+    __slots__ = ("proof", "timestamp", "public_data_json")
+
+    proof: ZKPProof
+    timestamp: float
+    public_data_json: bytes
+
+
 class ZKPGenerator:
     """
     零知识证明生成器
@@ -50,33 +114,67 @@ class ZKPGenerator:
         # 使用较大的素数作为模数（实际应用中应该使用更安全的参数）
         self.p = 2147483647  # 一个梅森素数 2^31 - 1
         self.g = 5  # 生成元
+        self.p_minus_1 = self.p - 1  # 指数运算的模数
+        self.g_table = _build_g_table(self.g, self.p)  # 生成元g的窗口预计算表，相同参数的实例共用
+    
+    def _fixed_base_pow(self, e: int) -> int:
+        """
+        计算 g^e mod p
+        g的阶整除p-1，先将指数约减到p-1以内，再按窗口查表相乘
+        """
+        e %= self.p_minus_1
+        mask = (1 << WINDOW_BITS) - 1
+        p = self.p
+        result = 1
+        for row in self.g_table:
+            result = result * row[e & mask] % p
+            e >>= WINDOW_BITS
+        return result
+    
+    def _hash_challenge(self, statement: str, u: int, public_data_json: bytes) -> int:
+        """
+        由statement、承诺u和已序列化的公共数据计算Fiat-Shamir挑战
+        输入以域分隔标签开头，各字段带长度前缀，避免不同输入拼接后产生歧义
+        """
+        statement_bytes = statement.encode()
+        u = int(u)
+        u_bytes = u.to_bytes((u.bit_length() + 7) // 8 or 1, 'big')
+        
+        h = _FIAT_SHAMIR_HASHER.copy()
+        for field in (statement_bytes, u_bytes, public_data_json):
+            h.update(len(field).to_bytes(4, 'big'))
+            h.update(field)
+        return int.from_bytes(h.digest()[:4], 'big') % self.p_minus_1
     
-    def generate_proof(self, statement: str, witness: str, public_data: Dict[str, Any] = None) -> ZKPProof:
+    def generate_proof(self, statement: str, witness: str, public_data: Dict[str, Any] = None,
+                       public_data_json: Optional[bytes] = None) -> ZKPProof:
         """
         生成零知识证明
         实现更完整的Schnorr协议
+        public_data_json为调用方已序列化好的公共数据，提供时不再重复序列化
         """
         if public_data is None:
             public_data = {}
+        if public_data_json is None:
+            public_data_json = serialize_public_data(public_data)
         
         # 将witness转换为整数
         witness_int = int.from_bytes(hashlib.sha256(witness.encode()).digest()[:4], 'big')
         
         # 计算h = g^w mod p (公钥)
-        h = pow(self.g, witness_int, self.p)
+        h = self._fixed_base_pow(witness_int)
         
         # 选择随机数r（承诺值）
-        r = secrets.randbelow(self.p - 1)
+        r = secrets.randbelow(self.p_minus_1)
         
         # 计算u = g^r mod p（承诺）
-        u = pow(self.g, r, self.p)
+        u = self._fixed_base_pow(r)
         
         # 生成挑战c（基于statement、承诺u和公共数据）
-        challenge_input = f"{statement}{u}{json.dumps(public_data, sort_keys=True)}"
-        c = int.from_bytes(hashlib.sha256(challenge_input.encode()).digest()[:4], 'big') % (self.p - 1)
+        c = self._hash_challenge(statement, u, public_data_json)
         
         # 计算响应z = r + c*w mod (p-1) 
-        z = (r + c * witness_int) % (self.p - 1)
+        z = (r + c * witness_int) % self.p_minus_1
         
         return ZKPProof(
             statement=statement,
@@ -86,10 +184,13 @@ class ZKPGenerator:
             public_data=public_data
         )
     
-    def verify_proof(self, proof: ZKPProof) -> bool:
+    def verify_proof(self, proof: ZKPProof, public_data_json: Optional[bytes] = None,
+                     public_keys: Optional[Dict[int, int]] = None) -> bool:
         """
         验证零知识证明
         使用更严格的验证逻辑
+        public_data_json为缓存的公共数据序列化结果，提供时不再重复序列化
+        public_keys为批量验证时共享的 witness -> h 缓存，同一证人的证明只计算一次公钥
         """
         try:
             # 从证明中获取值
@@ -99,28 +200,33 @@ class ZKPGenerator:
             z = int(proof.response)
             
             # 验证值的范围
-            if c < 0 or c >= self.p - 1 or z < 0 or z >= self.p - 1:
+            if c < 0 or c >= self.p_minus_1 or z < 0 or z >= self.p_minus_1:
                 return False
             
             # 计算 h = g^w mod p (公钥)
-            h = pow(self.g, witness_int, self.p)
+            if public_keys is None:
+                h = self._fixed_base_pow(witness_int)
+            else:
+                h = public_keys.get(witness_int)
+                if h is None:
+                    h = public_keys[witness_int] = self._fixed_base_pow(witness_int)
             
             # 计算 g^z mod p
-            gz = pow(self.g, z, self.p)
+            gz = self._fixed_base_pow(z)
             
-            # 计算 h^c mod p
-            hc = pow(h, c, self.p)
+            # 计算 h^(-c) mod p，h的阶整除p-1，因此h^(-c) = h^((-c) mod (p-1))，无需再求模逆
+            h_neg_c = powmod(h, -c % self.p_minus_1, self.p)
             
             # 计算 u' = g^z / h^c mod p = g^z * h^(-c) mod p
-            h_neg_c = pow(hc, self.p - 2, self.p)  # 计算模逆
             computed_u = (gz * h_neg_c) % self.p
             
             # 重新生成挑战并验证一致性
-            challenge_input = f"{statement}{computed_u}{json.dumps(proof.public_data, sort_keys=True)}"
-            expected_c = int.from_bytes(hashlib.sha256(challenge_input.encode()).digest()[:4], 'big') % (self.p - 1)
+            if public_data_json is None:
+                public_data_json = serialize_public_data(proof.public_data)
+            expected_c = self._hash_challenge(statement, computed_u, public_data_json)
             
-            # 验证挑战值是否匹配
-            return c == expected_c
+            # 验证挑战值是否匹配（c与expected_c均小于p-1 < 2^31，按4字节做恒定时间比较）
+            return hmac.compare_digest(c.to_bytes(4, 'big'), expected_c.to_bytes(4, 'big'))
         except Exception:
             return False
 
@@ -132,22 +238,28 @@ class ZKPManager:
     """
     def __init__(self):
         self.zkp_generator = ZKPGenerator()
-        self.proof_store: Dict[str, ZKPProof] = {}
-        self.proof_timestamps: Dict[str, float] = {}  # 存储证明创建时间戳
+        self.proof_store: Dict[str, ZKPRecord] = {}
+        self.expiry_index: List[Tuple[float, str]] = []  # 按创建时间排序的(时间戳, 证明ID)最小堆
     
     def create_proof(self, statement: str, witness: str, public_data: Dict[str, Any] = None) -> str:
         """
         创建零知识证明并返回证明ID
         """
-        proof = self.zkp_generator.generate_proof(statement, witness, public_data)
+        # 公共数据只序列化一次，证明生成和证明ID共用
+        public_data_json = serialize_public_data(public_data)
+        proof = self.zkp_generator.generate_proof(statement, witness, public_data, public_data_json)
         
-        # 生成证明ID
-        proof_id = hashlib.sha256(f"{statement}{witness}{json.dumps(public_data or {}, sort_keys=True)}".encode()).hexdigest()
+        # 生成证明ID（非协议关键的本地标识，使用更快的BLAKE2b，32字节摘要保持64位十六进制格式）
+        id_hash = hashlib.blake2b(digest_size=32)
+        id_hash.update(statement.encode())
+        id_hash.update(witness.encode())
+        id_hash.update(public_data_json)
+        proof_id = id_hash.hexdigest()
         
-        # 存储证明
-        self.proof_store[proof_id] = proof
-        # 存储时间戳
-        self.proof_timestamps[proof_id] = time.time()
+        # 存储证明及时间戳
+        timestamp = time.time()
+        self.proof_store[proof_id] = ZKPRecord(proof, timestamp, public_data_json)
+        heapq.heappush(self.expiry_index, (timestamp, proof_id))
         
         return proof_id
     
@@ -155,11 +267,27 @@ class ZKPManager:
         """
         通过ID验证零知识证明
         """
-        if proof_id not in self.proof_store:
+        record = self.proof_store.get(proof_id)
+        if record is None:
             return False
         
-        proof = self.proof_store[proof_id]
-        return self.zkp_generator.verify_proof(proof)
+        return self.zkp_generator.verify_proof(record.proof, record.public_data_json)
+    
+    def verify_proof_batch(self, proof_ids: List[str]) -> List[bool]:
+        """
+        批量验证多个证明，返回逐项的验证结果
+        证明只保存挑战c和响应z（不含承诺u），每个u都必须单独重算并哈希，
+        无法用随机线性组合合并为一次验证；批量时在证明间共享公钥h的计算
+        """
+        public_keys: Dict[int, int] = {}
+        results = []
+        for proof_id in proof_ids:
+            record = self.proof_store.get(proof_id)
+            results.append(
+                record is not None
+                and self.zkp_generator.verify_proof(record.proof, record.public_data_json, public_keys)
+            )
+        return results
     
     def verify_proof_data(self, proof: ZKPProof) -> bool:
         """
@@ -171,11 +299,13 @@ class ZKPManager:
         """
         获取证明数据
         """
-        return self.proof_store.get(proof_id)
+        record = self.proof_store.get(proof_id)
+        return record.proof if record else None
     
     def remove_proof(self, proof_id: str) -> bool:
         """
         移除证明
+        过期索引中残留的条目会在清理时被跳过
         """
         if proof_id in self.proof_store:
             del self.proof_store[proof_id]
@@ -185,22 +315,17 @@ class ZKPManager:
     def cleanup_expired_proofs(self, max_age: int = 3600) -> int:
         """
         清理过期的证明
+        只弹出过期索引头部已过期的条目，耗时与过期数量成正比
         """
-        import time
-        current_time = time.time()
-        expired_proof_ids = []
-        
-        # 找出过期的证明ID
-        for proof_id, timestamp in self.proof_timestamps.items():
-            if current_time - timestamp > max_age:
-                expired_proof_ids.append(proof_id)
-        
-        # 删除过期的证明
+        cutoff = time.time() - max_age
         removed_count = 0
-        for proof_id in expired_proof_ids:
-            if proof_id in self.proof_store:
+        
+        while self.expiry_index and self.expiry_index[0][0] < cutoff:
+            timestamp, proof_id = heapq.heappop(self.expiry_index)
+            record = self.proof_store.get(proof_id)
+            # 证明已被移除或之后被重新创建时，该索引条目已失效
+            if record is not None and record.timestamp == timestamp:
                 del self.proof_store[proof_id]
-                del self.proof_timestamps[proof_id]
                 removed_count += 1
         
         return removed_count
@@ -2,6 +2,8 @@
 class ChatConsole {
     constructor() {
         this.ws = null;
+        this.textDecoder = new TextDecoder();
+        this.nodeStats = {};  // 服务器只推送变化的统计字段，在此合并为完整状态
         this.currentTab = 'dashboard';
         this.init();
     }
@@ -184,6 +186,8 @@ class ChatConsole {
         
         try {
             this.ws = new WebSocket(wsUrl);
+            // 服务器以二进制帧推送UTF-8编码的JSON
+            this.ws.binaryType = 'arraybuffer';
             
             this.ws.onopen = () => {
                 console.log('WebSocket连接已建立');
@@ -192,7 +196,8 @@ class ChatConsole {
             };
             
             this.ws.onmessage = (event) => {
-                const data = JSON.parse(event.data);
+                const text = typeof event.data === 'string' ? event.data : this.textDecoder.decode(event.data);
+                const data = JSON.parse(text);
                 this.handleWebSocketMessage(data);
             };
             
@@ -212,8 +217,23 @@ class ChatConsole {
     }
     
     handleWebSocketMessage(data) {
-        // 处理从服务器发送的实时更新
-        console.log('收到WebSocket消息:', data);
+        // 处理从服务器推送的实时更新，取代定时轮询
+        if (data.type === 'update') {
+            if (data.stats) {
+                Object.assign(this.nodeStats, data.stats);
+                this.renderNodeStats(this.nodeStats);
+            }
+            if (data.blockchain) {
+                this.renderBlockchainInfo(data.blockchain);
+            }
+            if (data.routing && this.currentTab === 'network') {
+                this.renderRoutingTable(data.routing);
+            }
+        }
+    }
+    
+    isWebSocketOpen() {
+        return this.ws !== null && this.ws.readyState === WebSocket.OPEN;
     }
     
     async loadInitialData() {
@@ -229,33 +249,36 @@ class ChatConsole {
     async loadNodeStats() {
         try {
             const response = await fetch('/api/node/stats');
-            const stats = await response.json();
-            
-            // 更新控制台面板中的统计信息
-            this.updateStatElement('node-id', stats.node_id);
-            this.updateStatElement('uptime', this.formatDuration(stats.uptime));
-            this.updateStatElement('messages-sent', stats.messages_sent || 0);
-            this.updateStatElement('routing-size', stats.routing_table_size || 0);
-            
-            // 更新初学者界面中的统计信息
-            this.updateStatElement('node-id-beginner', stats.node_id);
-            this.updateStatElement('uptime-beginner', this.formatDuration(stats.uptime));
-            this.updateStatElement('chain-length-beginner', stats.blockchain_length || 0);
-            this.updateStatElement('routing-size-beginner', stats.routing_table_size || 0);
-            
-            // 激励信息
-            const incentive = stats.incentive_info || {};
-            this.updateStatElement('balance', incentive.balance || 0);
-            this.updateStatElement('reputation', (incentive.reputation_score || 0).toFixed(2));
-            this.updateStatElement('node-type', incentive.node_type || 'N/A');
-            
-            // 网络状态
-            this.updateStatElement('connected-nodes', stats.routing_table_size || 0);
+            this.nodeStats = await response.json();
+            this.renderNodeStats(this.nodeStats);
         } catch (error) {
             console.error('加载节点统计信息失败:', error);
         }
     }
     
+    renderNodeStats(stats) {
+        // 更新控制台面板中的统计信息
+        this.updateStatElement('node-id', stats.node_id);
+        this.updateStatElement('uptime', this.formatDuration(stats.uptime));
+        this.updateStatElement('messages-sent', stats.messages_sent || 0);
+        this.updateStatElement('routing-size', stats.routing_table_size || 0);
+        
+        // 更新初学者界面中的统计信息
+        this.updateStatElement('node-id-beginner', stats.node_id);
+        this.updateStatElement('uptime-beginner', this.formatDuration(stats.uptime));
+        this.updateStatElement('chain-length-beginner', stats.blockchain_length || 0);
+        this.updateStatElement('routing-size-beginner', stats.routing_table_size || 0);
+        
+        // 激励信息
+        const incentive = stats.incentive_info || {};
+        this.updateStatElement('balance', incentive.balance || 0);
+        this.updateStatElement('reputation', (incentive.reputation_score || 0).toFixed(2));
+        this.updateStatElement('node-type', incentive.node_type || 'N/A');
+        
+        // 网络状态
+        this.updateStatElement('connected-nodes', stats.routing_table_size || 0);
+    }
+    
     updateStatElement(elementId, value) {
         const element = document.getElementById(elementId);
         if (element) {
@@ -273,44 +296,48 @@ class ChatConsole {
     async loadBlockchainInfo() {
         try {
             const response = await fetch('/api/blockchain/info');
-            const info = await response.json();
-            
-            document.getElementById('chain-length').textContent = info.length || 0;
-            document.getElementById('chain-validity').textContent = info.valid ? '有效' : '无效';
-            document.getElementById('chain-length-info').textContent = info.length || 0;
-            document.getElementById('chain-valid').textContent = info.valid ? '有效' : '无效';
-            document.getElementById('latest-hash').textContent = info.latest_hash || 'N/A';
-            document.getElementById('oldest-hash').textContent = info.oldest_hash || 'N/A';
+            this.renderBlockchainInfo(await response.json());
         } catch (error) {
             console.error('加载区块链信息失败:', error);
         }
     }
     
+    renderBlockchainInfo(info) {
+        document.getElementById('chain-length').textContent = info.length || 0;
+        document.getElementById('chain-validity').textContent = info.valid ? '有效' : '无效';
+        document.getElementById('chain-length-info').textContent = info.length || 0;
+        document.getElementById('chain-valid').textContent = info.valid ? '有效' : '无效';
+        document.getElementById('latest-hash').textContent = info.latest_hash || 'N/A';
+        document.getElementById('oldest-hash').textContent = info.oldest_hash || 'N/A';
+    }
+    
     async loadRoutingTable() {
         try {
             const response = await fetch('/api/node/routing');
-            const routing = await response.json();
-            
-            const tbody = document.querySelector('#routing-table tbody');
-            tbody.innerHTML = '';
-            
-            routing.nodes.forEach(node => {
-                const row = document.createElement('tr');
-                row.innerHTML = `
-                    <td>${node.node_id}</td>
-                    <td>${node.host}</td>
-                    <td>${node.port}</td>
-                    <td title="${node.pub_key}">${node.pub_key}</td>
-                    <td>${node.public_url}</td>
-                    <td>${node.reputation ? node.reputation.toFixed(2) : '0.00'}</td>
-                `;
-                tbody.appendChild(row);
-            });
+            this.renderRoutingTable(await response.json());
         } catch (error) {
             console.error('加载路由表失败:', error);
         }
     }
     
+    renderRoutingTable(routing) {
+        const tbody = document.querySelector('#routing-table tbody');
+        tbody.innerHTML = '';
+        
+        routing.nodes.forEach(node => {
+            const row = document.createElement('tr');
+            row.innerHTML = `
+                <td>${node.node_id}</td>
+                <td>${node.host}</td>
+                <td>${node.port}</td>
+                <td title="${node.pub_key}">${node.pub_key}</td>
+                <td>${node.public_url}</td>
+                <td>${node.reputation ? node.reputation.toFixed(2) : '0.00'}</td>
+            `;
+            tbody.appendChild(row);
+        });
+    }
+    
     async loadBlockchain() {
         try {
             const response = await fetch('/api/blockchain/chain');
@@ -474,7 +501,9 @@ class ChatConsole {
     startAutoRefresh() {
         // 每30秒自动刷新节点状态
         setInterval(() => {
-            this.loadNodeStats();  // 总是更新节点统计信息，无论哪个标签页被激活
+            if (!this.isWebSocketOpen()) {
+                this.loadNodeStats();  // WebSocket断开时才轮询节点统计信息，连接时由服务器推送
+            }
             if (this.currentTab === 'nat') {
                 this.loadNatStatus();  // 如果在NAT标签页，也刷新NAT状态
             }
@@ -6,6 +6,7 @@ from src.zkp.zkp import ZKPManager, ZKPGenerator
 from src.blockchain.blockchain import Blockchain
 from src.crypto.crypto_manager import CryptoManager, KeyExchangeManager
 from cryptography.hazmat.primitives import serialization
+import heapq
 import time
 
 
@@ -20,7 +21,9 @@ def test_zkp():
     
     # 测试过期清理功能
     original_count = len(zkp_manager.proof_store)
-    zkp_manager.proof_timestamps[proof_id] = time.time() - 2  # 设置为2秒前
+    record = zkp_manager.proof_store[proof_id]
+    record.timestamp = time.time() - 2  # 设置为2秒前
+    heapq.heappush(zkp_manager.expiry_index, (record.timestamp, proof_id))
     removed = zkp_manager.cleanup_expired_proofs(max_age=1)  # 1秒过期
     print(f'   过期清理结果: {removed} 个证明被清理')
     
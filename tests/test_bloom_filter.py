@@ -0,0 +1,48 @@
+import unittest
+from src.utils.bloom_filter import BloomFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+    """BloomFilter类单元测试"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+    def test_add_and_contains(self):
+        """测试添加和查询元素"""
+        self.bloom.add("node_1")
+        self.bloom.add(b"raw_bytes")
+
+        self.assertIn("node_1", self.bloom)
+        self.assertIn(b"raw_bytes", self.bloom)
+        self.assertEqual(self.bloom.count, 2)
+
+    def test_no_false_negatives(self):
+        """测试已添加元素不会漏报"""
+        items = [f"item_{i}" for i in range(1000)]
+        for item in items:
+            self.bloom.add(item)
+
+        for item in items:
+            self.assertIn(item, self.bloom)
+
+    def test_false_positive_rate(self):
+        """测试误报率在预期范围内"""
+        for i in range(1000):
+            self.bloom.add(f"present_{i}")
+
+        false_positives = sum(1 for i in range(10000) if f"absent_{i}" in self.bloom)
+        self.assertLess(false_positives / 10000, 0.05)
+
+    def test_clear(self):
+        """测试清空过滤器"""
+        self.bloom.add("node_1")
+        self.bloom.clear()
+
+        self.assertNotIn("node_1", self.bloom)
+        self.assertEqual(self.bloom.count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
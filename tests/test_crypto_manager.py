@@ -5,10 +5,11 @@ from src.crypto.crypto_manager import CryptoManager
 class TestCryptoManager(unittest.TestCase):
     """加密管理器单元测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.crypto_manager = CryptoManager()
-        self.target_crypto_manager = CryptoManager()  # 用于测试加密/解密
+    @classmethod
+    def setUpClass(cls):
+        """测试前准备（RSA密钥生成代价较高，整个测试类共用一对管理器）"""
+        cls.crypto_manager = CryptoManager()
+        cls.target_crypto_manager = CryptoManager()  # 用于测试加密/解密
     
     def test_key_generation(self):
         """测试密钥生成"""
@@ -20,6 +21,13 @@ class TestCryptoManager(unittest.TestCase):
         self.assertTrue(pem.startswith("-----BEGIN PUBLIC KEY-----"))
         self.assertTrue(pem.endswith("-----END PUBLIC KEY-----\n"))
     
+    def test_node_id(self):
+        """测试节点ID格式与区分度"""
+        node_id = self.crypto_manager.get_node_id()
+        self.assertEqual(len(node_id), 16)
+        int(node_id, 16)  # 必须是十六进制字符串
+        self.assertNotEqual(node_id, self.target_crypto_manager.get_node_id())
+    
     def test_load_pub_key(self):
         """测试加载公钥"""
         pem = self.crypto_manager.get_pub_key_pem()
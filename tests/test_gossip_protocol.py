@@ -2,6 +2,15 @@ import unittest
 import asyncio
 from src.gossip.gossip_protocol import GossipManager, GossipType, GossipProtocol
 
+# 预先绑定枚举成员，避免反复通过枚举类查找
+_DATA_SYNC, _MEMBERSHIP, _CUSTOM = GossipType.DATA_SYNC, GossipType.MEMBERSHIP, GossipType.CUSTOM
+
+
+class MockRoutingTableManager:
+    """模拟路由表管理器"""
+    def get_active_nodes(self):
+        return []
+
 
 class TestGossipProtocol(unittest.TestCase):
     """Gossip协议单元测试"""
@@ -9,10 +18,6 @@ class TestGossipProtocol(unittest.TestCase):
     def setUp(self):
         """测试前准备"""
         # 由于GossipProtocol需要routing_table_manager，我们使用模拟对象
-        class MockRoutingTableManager:
-            def get_active_nodes(self):
-                return []
-        
         self.mock_routing_manager = MockRoutingTableManager()
         self.gossip_protocol = GossipProtocol("test_node", self.mock_routing_manager)
     
@@ -25,9 +30,9 @@ class TestGossipProtocol(unittest.TestCase):
         
     def test_gossip_type_enum(self):
         """测试Gossip类型枚举"""
-        self.assertEqual(GossipType.DATA_SYNC.value, "data_sync")
-        self.assertEqual(GossipType.MEMBERSHIP.value, "membership")
-        self.assertEqual(GossipType.CUSTOM.value, "custom")
+        self.assertEqual(_DATA_SYNC.value, "data_sync")
+        self.assertEqual(_MEMBERSHIP.value, "membership")
+        self.assertEqual(_CUSTOM.value, "custom")
 
 
 class TestGossipManager(unittest.TestCase):
@@ -35,10 +40,6 @@ class TestGossipManager(unittest.TestCase):
     
     def setUp(self):
         """测试前准备"""
-        class MockRoutingTableManager:
-            def get_active_nodes(self):
-                return []
-        
         self.mock_routing_manager = MockRoutingTableManager()
         self.gossip_manager = GossipManager("test_node", self.mock_routing_manager)
     
@@ -2,6 +2,9 @@ import unittest
 import time
 from src.incentive.incentive_mechanism import IncentiveMechanism, NodeType, NodeMetrics, RewardPool
 
+# 预先绑定枚举成员，避免在循环中反复通过枚举类查找
+_FULL, _RELAY, _LIGHT = NodeType.FULL, NodeType.RELAY, NodeType.LIGHT
+
 
 class TestIncentiveMechanism(unittest.TestCase):
     """激励机制单元测试"""
@@ -44,11 +47,11 @@ class TestIncentiveMechanism(unittest.TestCase):
         node_id = "test_node_123"
         
         # 注册节点
-        self.incentive_mechanism.register_node(node_id, NodeType.FULL)
+        self.incentive_mechanism.register_node(node_id, _FULL)
         
         # 检查节点是否已注册
         self.assertIn(node_id, self.incentive_mechanism.node_types)
-        self.assertEqual(self.incentive_mechanism.node_types[node_id], NodeType.FULL)
+        self.assertEqual(self.incentive_mechanism.node_types[node_id], _FULL)
         self.assertIn(node_id, self.incentive_mechanism.node_metrics)
         self.assertIn(node_id, self.incentive_mechanism.node_balances)
         self.assertEqual(self.incentive_mechanism.node_balances[node_id], 0)
@@ -56,7 +59,7 @@ class TestIncentiveMechanism(unittest.TestCase):
     def test_update_node_metrics(self):
         """测试更新节点指标"""
         node_id = "test_node_456"
-        self.incentive_mechanism.register_node(node_id, NodeType.LIGHT)
+        self.incentive_mechanism.register_node(node_id, _LIGHT)
         
         # 更新指标
         self.incentive_mechanism.update_node_metrics(
@@ -76,7 +79,7 @@ class TestIncentiveMechanism(unittest.TestCase):
     def test_calculate_reputation_score(self):
         """测试计算声誉分数"""
         node_id = "test_node_789"
-        self.incentive_mechanism.register_node(node_id, NodeType.RELAY)
+        self.incentive_mechanism.register_node(node_id, _RELAY)
         
         # 更新一些指标
         self.incentive_mechanism.update_node_metrics(
@@ -97,33 +100,34 @@ class TestIncentiveMechanism(unittest.TestCase):
     
     def test_calculate_reward(self):
         """测试计算奖励"""
-        # 注册不同类型节点
-        self.incentive_mechanism.register_node("full_node", NodeType.FULL)
-        self.incentive_mechanism.register_node("relay_node", NodeType.RELAY)
-        self.incentive_mechanism.register_node("light_node", NodeType.LIGHT)
-        
-        # 更新指标
-        self.incentive_mechanism.update_node_metrics("full_node", blocks_validated=10, storage_provided=1000*1024*1024)
-        self.incentive_mechanism.update_node_metrics("relay_node", messages_forwarded=500, bandwidth_provided=100*1024*1024)
-        self.incentive_mechanism.update_node_metrics("light_node", messages_forwarded=10)
-        
-        # 计算奖励
-        full_reward = self.incentive_mechanism.calculate_reward("full_node")
-        relay_reward = self.incentive_mechanism.calculate_reward("relay_node")
-        light_reward = self.incentive_mechanism.calculate_reward("light_node")
-        
-        # 验证奖励计算
-        self.assertGreaterEqual(full_reward, 0)
-        self.assertGreaterEqual(relay_reward, 0)
-        self.assertGreaterEqual(light_reward, 0)
+        cases = [
+            ("full_node", _FULL, dict(blocks_validated=10, storage_provided=1000*1024*1024)),
+            ("relay_node", _RELAY, dict(messages_forwarded=500, bandwidth_provided=100*1024*1024)),
+            ("light_node", _LIGHT, dict(messages_forwarded=10)),
+        ]
+        register = self.incentive_mechanism.register_node
+        update = self.incentive_mechanism.update_node_metrics
+        calculate = self.incentive_mechanism.calculate_reward
+        
+        # 注册不同类型节点并更新指标
+        for node_id, node_type, metrics in cases:
+            register(node_id, node_type)
+            update(node_id, **metrics)
+        
+        # 计算并验证奖励
+        rewards = {}
+        for node_id, _, _ in cases:
+            with self.subTest(node=node_id):
+                rewards[node_id] = calculate(node_id)
+                self.assertGreaterEqual(rewards[node_id], 0)
         
         # 完整节点应该获得更高奖励
-        self.assertGreaterEqual(full_reward, light_reward)
+        self.assertGreaterEqual(rewards["full_node"], rewards["light_node"])
     
     def test_distribute_rewards(self):
         """测试分配奖励"""
         node_id = "test_node_999"
-        self.incentive_mechanism.register_node(node_id, NodeType.FULL)
+        self.incentive_mechanism.register_node(node_id, _FULL)
         
         # 更新指标
         self.incentive_mechanism.update_node_metrics(node_id, blocks_validated=5)
@@ -142,7 +146,7 @@ class TestIncentiveMechanism(unittest.TestCase):
     def test_get_node_info(self):
         """测试获取节点信息"""
         node_id = "info_test_node"
-        self.incentive_mechanism.register_node(node_id, NodeType.FULL)
+        self.incentive_mechanism.register_node(node_id, _FULL)
         
         # 更新指标
         self.incentive_mechanism.update_node_metrics(
@@ -157,7 +161,7 @@ class TestIncentiveMechanism(unittest.TestCase):
         
         self.assertIsNotNone(node_info)
         self.assertEqual(node_info["node_id"], node_id)
-        self.assertEqual(node_info["node_type"], NodeType.FULL.value)
+        self.assertEqual(node_info["node_type"], _FULL.value)
         self.assertEqual(node_info["messages_forwarded"], 10)
         self.assertEqual(node_info["blocks_validated"], 5)
         self.assertEqual(node_info["bandwidth_provided"], 1024*1024)
@@ -165,6 +169,30 @@ class TestIncentiveMechanism(unittest.TestCase):
         # 测试获取不存在节点的信息
         nonexistent_info = self.incentive_mechanism.get_node_info("nonexistent")
         self.assertIsNone(nonexistent_info)
+    
+    def test_get_node_info_cache_invalidation(self):
+        """测试节点信息缓存在数据变化后失效"""
+        node_id = "cache_test_node"
+        self.incentive_mechanism.register_node(node_id, _FULL)
+        
+        info = self.incentive_mechanism.get_node_info(node_id)
+        self.assertIs(self.incentive_mechanism.get_node_info(node_id), info)
+        
+        # 更新指标后返回新数据
+        self.incentive_mechanism.update_node_metrics(node_id, blocks_validated=5)
+        info = self.incentive_mechanism.get_node_info(node_id)
+        self.assertEqual(info["blocks_validated"], 5)
+        
+        # 分发奖励后余额随之更新
+        self.incentive_mechanism.distribute_rewards()
+        info = self.incentive_mechanism.get_node_info(node_id)
+        self.assertEqual(info["balance"], self.incentive_mechanism.node_balances[node_id])
+        self.assertGreater(info["balance"], 0)
+        
+        # 质押后余额随之更新
+        self.assertTrue(self.incentive_mechanism.stake_tokens(node_id, 1))
+        info = self.incentive_mechanism.get_node_info(node_id)
+        self.assertEqual(info["balance"], self.incentive_mechanism.node_balances[node_id])
 
 
 if __name__ == '__main__':
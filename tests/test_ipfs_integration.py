@@ -1,9 +1,49 @@
 import unittest
 import asyncio
+import hashlib
 import tempfile
 import os
+from unittest.mock import patch
 from src.ipfs.ipfs_integration import IPFSClient, IPFSStorage, BlockchainIPFSBridge
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps  # 直接返回UTF-8字节
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_dumps = lambda obj: json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    _json_loads = json.loads
+
+# 测试用的大型数据，在模块加载时构造一次（测试不会修改它们）
+_LARGE_DATA = {
+    "block_data": "A" * 1000,  # 模拟大块数据
+    "transactions": [{"from": f"node_{i}", "to": f"node_{i+1}", "amount": i} for i in range(10)],
+    "metadata": {"version": "1.0", "type": "block_data"}
+}
+
+_MOCK_LARGE_DATA = {
+    "block_data": "A" * 100,  # 较小的数据用于模拟客户端测试
+    "transactions": [{"from": f"node_{i}", "to": f"node_{i+1}", "amount": i} for i in range(5)],
+    "metadata": {"version": "1.0", "type": "block_data"}
+}
+
+
+class AsyncTestCase(unittest.TestCase):
+    """在整个测试类中复用同一个事件循环，避免每个测试都创建和销毁循环"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.close()
+
+    def run_async(self, coro):
+        """在共享事件循环中运行协程"""
+        return self.loop.run_until_complete(coro)
+
 
 class TestIPFSClient(unittest.TestCase):
     """IPFSClient类单元测试"""
@@ -102,41 +142,29 @@ class TestIPFSStorage(unittest.TestCase):
     def test_store_and_retrieve_file(self):
         """测试存储和检索文件"""
         async def async_test():
-            # 创建临时文件进行测试
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
-                temp_file.write("Test file content for IPFS")
-                temp_file_path = temp_file.name
-            
-            try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # 创建临时文件进行测试
+                temp_file_path = os.path.join(temp_dir, "test.txt")
+                with open(temp_file_path, 'w', encoding='utf-8') as temp_file:
+                    temp_file.write("Test file content for IPFS")
+                
                 # 存储文件
                 ipfs_hash = await self.storage.store_file(temp_file_path)
                 
                 if ipfs_hash:
                     # 检索文件到新位置
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='_retrieved.txt') as output_file:
-                        output_path = output_file.name
+                    output_path = os.path.join(temp_dir, "test_retrieved.txt")
+                    success = await self.storage.retrieve_file(ipfs_hash, output_path)
+                    self.assertTrue(success)
+                    
+                    # 验证文件内容
+                    with open(output_path, 'r', encoding='utf-8') as f:
+                        retrieved_content = f.read()
+                    
+                    with open(temp_file_path, 'r', encoding='utf-8') as f:
+                        original_content = f.read()
                     
-                    try:
-                        success = await self.storage.retrieve_file(ipfs_hash, output_path)
-                        self.assertTrue(success)
-                        
-                        # 验证文件内容
-                        with open(output_path, 'r', encoding='utf-8') as f:
-                            retrieved_content = f.read()
-                        
-                        with open(temp_file_path, 'r', encoding='utf-8') as f:
-                            original_content = f.read()
-                        
-                        self.assertEqual(retrieved_content, original_content)
-                        
-                    finally:
-                        # 清理检索的文件
-                        if os.path.exists(output_path):
-                            os.remove(output_path)
-            finally:
-                # 清理临时文件
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
+                    self.assertEqual(retrieved_content, original_content)
         
         asyncio.run(async_test())
 
@@ -153,11 +181,7 @@ class TestBlockchainIPFSBridge(unittest.TestCase):
     def test_store_and_retrieve_large_data(self):
         """测试存储和检索大型数据"""
         async def async_test():
-            large_data = {
-                "block_data": "A" * 1000,  # 模拟大块数据
-                "transactions": [{"from": f"node_{i}", "to": f"node_{i+1}", "amount": i} for i in range(10)],
-                "metadata": {"version": "1.0", "type": "block_data"}
-            }
+            large_data = _LARGE_DATA
             
             # 存储大型数据
             reference = await self.bridge.store_large_data(large_data)
@@ -179,7 +203,7 @@ class MockIPFSClient:
     
     def __init__(self, api_url: str = "http://localhost:5001"):
         self.api_url = api_url
-        self.storage = {}  # 模拟存储
+        self.storage = {}  # 模拟存储，以原始摘要字节为键
     
     async def __aenter__(self):
         return self
@@ -187,58 +211,70 @@ class MockIPFSClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         pass
 
+    async def close(self):
+        """模拟关闭会话"""
+        pass
+
     async def add_bytes(self, data: bytes, filename: str = "data") -> dict:
         """模拟添加字节数据"""
-        import hashlib
-        ipfs_hash = hashlib.sha256(data).hexdigest()[:16]  # 简化的哈希
-        self.storage[ipfs_hash] = data
-        return {"Hash": ipfs_hash, "Name": filename}
+        digest = hashlib.blake2b(data, digest_size=8).digest()  # 简化的哈希，无需抗碰撞
+        self.storage[digest] = data
+        return {"Hash": digest.hex(), "Name": filename}
+
+    @staticmethod
+    def _key(ipfs_hash: str) -> bytes:
+        """将十六进制哈希转换为存储键，非法哈希返回空字节"""
+        try:
+            return bytes.fromhex(ipfs_hash)
+        except ValueError:
+            return b""
     
     async def get_bytes(self, ipfs_hash: str) -> bytes:
         """模拟获取字节数据"""
-        return self.storage.get(ipfs_hash)
+        return self.storage.get(self._key(ipfs_hash))
     
     async def add_json(self, data) -> dict:
         """模拟添加JSON数据"""
-        import json
-        json_str = json.dumps(data, ensure_ascii=False)
-        return await self.add_bytes(json_str.encode('utf-8'), "data.json")
+        return await self.add_bytes(_json_dumps(data), "data.json")
     
     async def get_json(self, ipfs_hash: str):
         """模拟获取JSON数据"""
-        import json
         data = await self.get_bytes(ipfs_hash)
         if data:
-            return json.loads(data.decode('utf-8'))
+            return _json_loads(data)
         return None
     
     async def pin_add(self, ipfs_hash: str) -> bool:
         """模拟固定操作"""
-        return ipfs_hash in self.storage
+        return self._key(ipfs_hash) in self.storage
     
     async def pin_rm(self, ipfs_hash: str) -> bool:
         """模拟取消固定操作"""
-        return ipfs_hash in self.storage
+        return self._key(ipfs_hash) in self.storage
     
     async def get_stats(self) -> dict:
         """模拟获取统计信息"""
         return {"totalIn": 100, "totalOut": 100, "rateIn": 10, "rateOut": 10}
 
 
-class TestIPFSStorageWithMock(unittest.TestCase):
+class MockIPFSTestCase(AsyncTestCase):
+    """在整个测试类期间将IPFSClient替换为模拟客户端"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        patcher = patch('src.ipfs.ipfs_integration.IPFSClient', MockIPFSClient)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+
+class TestIPFSStorageWithMock(MockIPFSTestCase):
     """使用模拟客户端的IPFSStorage单元测试"""
     
     def setUp(self):
         """测试前准备"""
-        from unittest.mock import patch
-        self.patcher = patch('src.ipfs.ipfs_integration.IPFSClient', MockIPFSClient)
-        self.MockIPFSClient = self.patcher.start()
         self.storage = IPFSStorage(api_url="http://localhost:5001")
     
-    def tearDown(self):
-        """测试后清理"""
-        self.patcher.stop()
-    
     def test_store_and_retrieve_data_with_mock(self):
         """使用模拟客户端测试存储和检索数据"""
         async def async_test():
@@ -258,7 +294,7 @@ class TestIPFSStorageWithMock(unittest.TestCase):
             retrieved_json = await self.storage.retrieve_data(ipfs_hash)
             self.assertEqual(retrieved_json, test_json)
         
-        asyncio.run(async_test())
+        self.run_async(async_test())
     
     def test_store_and_retrieve_bytes_with_mock(self):
         """使用模拟客户端测试存储和检索字节数据"""
@@ -270,33 +306,21 @@ class TestIPFSStorageWithMock(unittest.TestCase):
             retrieved_bytes = await self.storage.retrieve_data(ipfs_hash)
             self.assertEqual(retrieved_bytes, test_bytes)
         
-        asyncio.run(async_test())
+        self.run_async(async_test())
 
 
-class TestBlockchainIPFSBridgeWithMock(unittest.TestCase):
+class TestBlockchainIPFSBridgeWithMock(MockIPFSTestCase):
     """使用模拟客户端的BlockchainIPFSBridge单元测试"""
     
     def setUp(self):
         """测试前准备"""
-        from unittest.mock import patch
-        self.patcher = patch('src.ipfs.ipfs_integration.IPFSClient', MockIPFSClient)
-        self.patcher.start()
-        
         mock_storage = IPFSStorage(api_url="http://localhost:5001")
         self.bridge = BlockchainIPFSBridge(mock_storage)
     
-    def tearDown(self):
-        """测试后清理"""
-        self.patcher.stop()
-    
     def test_store_and_retrieve_large_data_with_mock(self):
         """使用模拟客户端测试存储和检索大型数据"""
         async def async_test():
-            large_data = {
-                "block_data": "A" * 100,  # 较小的数据用于测试
-                "transactions": [{"from": f"node_{i}", "to": f"node_{i+1}", "amount": i} for i in range(5)],
-                "metadata": {"version": "1.0", "type": "block_data"}
-            }
+            large_data = _MOCK_LARGE_DATA
             
             # 存储大型数据
             reference = await self.bridge.store_large_data(large_data)
@@ -309,7 +333,23 @@ class TestBlockchainIPFSBridgeWithMock(unittest.TestCase):
             retrieved_data = await self.bridge.retrieve_large_data(reference)
             self.assertEqual(retrieved_data, large_data)
         
-        asyncio.run(async_test())
+        self.run_async(async_test())
+
+    def test_store_and_retrieve_batch_with_mock(self):
+        """使用模拟客户端测试并发批量存储和检索"""
+        async def async_test():
+            items = [{"index": i, "block_data": f"chunk_{i}" * 10} for i in range(5)]
+
+            references = await self.bridge.store_large_data_batch(items)
+            self.assertEqual(len(references), len(items))
+            self.assertTrue(all(ref is not None for ref in references))
+
+            # 结果顺序与输入顺序一致
+            retrieved = await self.bridge.retrieve_large_data_batch(references)
+            self.assertEqual([r["index"] for r in retrieved], list(range(5)))
+            self.assertEqual(retrieved, items)
+
+        self.run_async(async_test())
 
 
 if __name__ == '__main__':
@@ -1,15 +1,17 @@
 import unittest
 import os
+import tempfile
 from src.multimedia.multimedia import MultimediaMessage, MultimediaProcessor, EncryptedMultimediaProcessor
 
 
 class TestMultimedia(unittest.TestCase):
     """多媒体处理单元测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.processor = MultimediaProcessor()
-        self.encrypted_processor = EncryptedMultimediaProcessor()
+    @classmethod
+    def setUpClass(cls):
+        """测试前准备（处理器不保存测试间状态，整个测试类共用）"""
+        cls.processor = MultimediaProcessor()
+        cls.encrypted_processor = EncryptedMultimediaProcessor()
     
     def test_multimedia_message_creation(self):
         """测试多媒体消息创建"""
@@ -72,23 +74,27 @@ class TestMultimedia(unittest.TestCase):
     
     def test_file_extension(self):
         """测试文件扩展名获取"""
-        test_cases = [
-            ("image/jpeg", ".jpg"),
-            ("image/png", ".png"),
-            ("video/mp4", ".mp4"),
-            ("audio/mp3", ".mp3"),
-            ("text/plain", ".txt"),
-            ("application/pdf", ".pdf"),
-            ("unknown/type", ".bin")
-        ]
-        
-        for media_type, expected_ext in test_cases:
+        test_cases = {
+            "image/jpeg": ".jpg",
+            "image/png": ".png",
+            "video/mp4": ".mp4",
+            "audio/mp3": ".mp3",
+            "text/plain": ".txt",
+            "application/pdf": ".pdf",
+            "unknown/type": ".bin"
+        }
+        
+        actual = {}
+        for media_type in test_cases:
             msg = self.processor.create_multimedia_message(
                 media_type, b"test data"
             )
             # 确保消息创建成功
             self.assertIsNotNone(msg)
-            self.assertEqual(msg.get_file_extension(), expected_ext)
+            actual[media_type] = msg.get_file_extension()
+        
+        # 一次比较整张表，失败时列出所有不一致的条目
+        self.assertEqual(actual, test_cases)
     
     def test_save_and_load_file(self):
         """测试保存和加载文件"""
@@ -101,23 +107,20 @@ class TestMultimedia(unittest.TestCase):
         # 确保消息创建成功
         self.assertIsNotNone(msg)
         
-        # 保存到文件
-        filename = f"test_{msg.message_id}.txt"
-        success = self.processor.save_to_file(msg, filename)
-        self.assertTrue(success)
-        
-        # 检查文件是否存在
-        self.assertTrue(os.path.exists(filename))
-        
-        # 从文件加载
-        loaded_msg = self.processor.load_from_file(filename, media_type)
-        self.assertIsNotNone(loaded_msg)
-        self.assertEqual(loaded_msg.data, data)
-        self.assertEqual(loaded_msg.media_type, media_type)
-        
-        # 清理测试文件
-        if os.path.exists(filename):
-            os.remove(filename)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # 保存到文件
+            filename = os.path.join(temp_dir, f"test_{msg.message_id}.txt")
+            success = self.processor.save_to_file(msg, filename)
+            self.assertTrue(success)
+            
+            # 检查文件是否存在
+            self.assertTrue(os.path.exists(filename))
+            
+            # 从文件加载
+            loaded_msg = self.processor.load_from_file(filename, media_type)
+            self.assertIsNotNone(loaded_msg)
+            self.assertEqual(loaded_msg.data, data)
+            self.assertEqual(loaded_msg.media_type, media_type)
     
     def test_encrypted_multimedia_processing(self):
         """测试加密多媒体处理"""
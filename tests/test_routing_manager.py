@@ -1,5 +1,8 @@
 import unittest
 import asyncio
+import sys
+from unittest.mock import patch
+from src.routing import routing_manager
 from src.routing.routing_manager import RoutingTableManager, NodeInfo, NodeType
 
 
@@ -152,6 +155,51 @@ class TestRoutingTableManager(unittest.TestCase):
         self.assertEqual(len(light_nodes), 1)
         self.assertEqual(light_nodes[0].node_id, "light_node")
     
+    def test_indexes_follow_updates(self):
+        """测试活跃节点和类型索引随节点变更同步更新"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1", node_type=NodeType.FULL)
+        self.manager.add_node("node2", "127.0.0.2", 8081, "pub_key2")
+        
+        # 重新添加时更改类型
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1", node_type=NodeType.RELAY)
+        self.assertEqual(self.manager.get_nodes_by_type(NodeType.FULL), [])
+        self.assertEqual([n.node_id for n in self.manager.get_nodes_by_type(NodeType.RELAY)], ["node1"])
+        
+        # 停用后重新添加会恢复活跃
+        self.manager.update_node_status("node2", is_active=False)
+        self.assertEqual([n.node_id for n in self.manager.get_active_nodes()], ["node1"])
+        self.manager.add_node("node2", "127.0.0.2", 8081, "pub_key2")
+        self.assertEqual({n.node_id for n in self.manager.get_active_nodes()}, {"node1", "node2"})
+        
+        # 移除后从所有索引中消失
+        self.manager.remove_node("node1")
+        self.assertEqual([n.node_id for n in self.manager.get_active_nodes()], ["node2"])
+        self.assertEqual(self.manager.get_nodes_by_type(NodeType.RELAY), [])
+        
+        # 反序列化后索引被重建
+        restored = RoutingTableManager.from_dict(self.manager.to_dict())
+        self.assertEqual([n.node_id for n in restored.get_active_nodes()], ["node2"])
+        self.assertEqual([n.node_id for n in restored.get_nodes_by_type(NodeType.LIGHT)], ["node2"])
+    
+    def test_evicts_least_recently_seen_node(self):
+        """测试路由表满时淘汰最久未活跃的节点"""
+        manager = RoutingTableManager(local_node_id="test_node", max_nodes=3)
+        for i in range(3):
+            manager.add_node(f"node{i}", "127.0.0.1", 8080 + i, f"pub_key{i}")
+        
+        # node0重新活跃后，node1成为最旧的节点
+        manager.update_node_status("node0", is_active=True)
+        manager.add_node("node3", "127.0.0.1", 8083, "pub_key3")
+        
+        self.assertEqual(set(manager.routing_table), {"node0", "node2", "node3"})
+        
+        # 超过30分钟未活跃的节点被标记为不活跃
+        manager.routing_table["node2"].last_seen -= 3600
+        manager._rebuild_indexes()
+        manager.cleanup_inactive_nodes()
+        self.assertFalse(manager.get_node("node2").is_active)
+        self.assertTrue(manager.get_node("node0").is_active)
+    
     def test_get_optimal_route(self):
         """测试获取最优路由"""
         # 添加节点
@@ -181,6 +229,83 @@ class TestRoutingTableManager(unittest.TestCase):
         self.assertLessEqual(len(best_nodes), 5)
         self.assertGreaterEqual(len(best_nodes), 0)
     
+    def test_route_ranking_cache_invalidation(self):
+        """测试路由排序缓存在节点变化后失效"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1")
+        self.manager.add_node("node2", "127.0.0.2", 8081, "pub_key2")
+        self.manager.update_node_status("node1", latency=50.0)
+        self.manager.update_node_status("node2", latency=200.0)
+        
+        self.assertEqual(self.manager.get_optimal_route("target_node").node_id, "node1")
+        self.assertEqual(self.manager.get_optimal_route("node1").node_id, "node2")
+        
+        # 延迟变化后重新排序
+        self.manager.update_node_status("node1", latency=5000.0)
+        self.assertEqual(self.manager.get_optimal_route("target_node").node_id, "node2")
+        
+        # 声誉变化后广播排序随之变化
+        self.manager.update_node_reputation("node2", success=False)
+        best = self.manager.get_best_nodes_for_broadcast(count=1)
+        self.assertEqual([n.node_id for n in best], ["node1"])
+        
+        # 停用节点后不再参与路由
+        self.manager.update_node_status("node1", is_active=False)
+        self.assertEqual(self.manager.get_optimal_route("target_node").node_id, "node2")
+        self.assertIsNone(self.manager.get_optimal_route("target_node", exclude_nodes=["node2"]))
+    
+    def test_pub_key_short(self):
+        """测试公钥截断形式随公钥更新"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "k" * 60)
+        node = self.manager.get_node("node1")
+        self.assertEqual(node.pub_key_short, "k" * 50 + "...")
+        
+        self.manager.add_node("node1", "127.0.0.1", 8080, "short_key")
+        self.assertEqual(node.pub_key, "short_key")
+        self.assertEqual(node.pub_key_short, "short_key")
+    
+    def test_health_check_bumps_version(self):
+        """测试健康检查更新last_ping后版本号递增"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1")
+        node = self.manager.get_node("node1")
+        node.last_ping = 0
+
+        version = self.manager.version
+        with patch.object(self.manager, "_ping_node", return_value=True), \
+                patch.object(self.manager, "update_node_reputation"):
+            asyncio.run(self.manager._perform_health_check())
+        self.assertGreater(node.last_ping, 0)
+        self.assertGreater(self.manager.version, version)
+    
+    def test_host_interned(self):
+        """测试主机地址在添加和更新节点时都被驻留"""
+        self.manager.add_node("node1", "".join(["10.0.0.", "1"]), 8080, "pub_key1")
+        self.manager.add_node("node2", "".join(["10.0.0.", "1"]), 8081, "pub_key2")
+        self.assertIs(self.manager.get_node("node1").host, self.manager.get_node("node2").host)
+
+        self.manager.add_node("node1", "".join(["10.0.0.", "2"]), 8080, "pub_key1")
+        self.assertIs(self.manager.get_node("node1").host, sys.intern("10.0.0.2"))
+    
+    def test_version_tracks_changes(self):
+        """测试路由表版本号随变化递增"""
+        version = self.manager.version
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1")
+        self.assertGreater(self.manager.version, version)
+        
+        for change in (
+            lambda: self.manager.add_node("node1", "127.0.0.9", 8080, "pub_key1"),
+            lambda: self.manager.update_node_reputation("node1", success=True),
+            lambda: self.manager.remove_node("node1"),
+        ):
+            version = self.manager.version
+            change()
+            self.assertGreater(self.manager.version, version)
+        
+        # 未发生变化时版本号不变
+        version = self.manager.version
+        self.manager.remove_node("node1")
+        self.manager.get_all_nodes()
+        self.assertEqual(self.manager.version, version)
+    
     def test_routing_stats(self):
         """测试路由统计"""
         # 添加节点
@@ -189,6 +314,22 @@ class TestRoutingTableManager(unittest.TestCase):
         stats = self.manager.get_routing_stats()
         self.assertEqual(stats["total_nodes"], 1)
     
+    def test_routing_stats_breakdown(self):
+        """测试路由统计中的分类、活跃数和平均值"""
+        self.manager.add_node("full_node", "127.0.0.1", 8080, "pub_key1", node_type=NodeType.FULL)
+        self.manager.add_node("relay_node", "127.0.0.2", 8081, "pub_key2", node_type=NodeType.RELAY)
+        self.manager.add_node("light_node", "127.0.0.3", 8082, "pub_key3")
+        self.manager.update_node_status("full_node", latency=100.0)
+        self.manager.update_node_status("relay_node", latency=300.0)
+        self.manager.update_node_status("light_node", is_active=False, latency=50.0)
+        
+        stats = self.manager.get_routing_stats()
+        self.assertEqual(stats["total_nodes"], 3)
+        self.assertEqual(stats["active_nodes"], 2)
+        self.assertEqual((stats["full_nodes"], stats["relay_nodes"], stats["light_nodes"]), (1, 1, 1))
+        self.assertAlmostEqual(stats["avg_latency"], 200.0)
+        self.assertAlmostEqual(stats["avg_reputation"], 1.0)
+    
     def test_serialization(self):
         """测试序列化和反序列化"""
         # 添加节点
@@ -203,6 +344,51 @@ class TestRoutingTableManager(unittest.TestCase):
         self.assertEqual(len(new_manager.routing_table), 1)
         self.assertIn("node1", new_manager.routing_table)
 
+    def test_binary_serialization(self):
+        """测试紧凑二进制序列化往返"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1", node_type=NodeType.FULL)
+        self.manager.add_node("node2", "127.0.0.2", 8081, "pub_key2")
+        self.manager.update_node_status("node2", is_active=False)
+
+        new_manager = RoutingTableManager.from_bytes(self.manager.to_bytes())
+
+        self.assertEqual(new_manager.local_node_id, self.manager.local_node_id)
+        for node_id in ("node1", "node2"):
+            self.assertEqual(new_manager.get_node(node_id).to_dict(),
+                             self.manager.get_node(node_id).to_dict())
+        self.assertEqual([n.node_id for n in new_manager.get_active_nodes()], ["node1"])
+
+    def test_binary_format_tag(self):
+        """测试二进制数据的读取不依赖本地是否安装msgpack"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1")
+
+        # JSON格式的数据在启用msgpack的进程中仍可读取
+        with patch.object(routing_manager, "MSGPACK_AVAILABLE", False):
+            data = self.manager.to_bytes()
+        with patch.object(routing_manager, "MSGPACK_AVAILABLE", True):
+            new_manager = RoutingTableManager.from_bytes(data)
+        self.assertEqual(new_manager.get_node("node1").to_dict(), self.manager.get_node("node1").to_dict())
+
+        # 未安装msgpack时读取msgpack格式的数据给出明确错误
+        with patch.object(routing_manager, "MSGPACK_AVAILABLE", False):
+            with self.assertRaises(ValueError):
+                RoutingTableManager.from_bytes(b"M\x80")
+        with self.assertRaises(ValueError):
+            RoutingTableManager.from_bytes(b"{}")
+
+    @unittest.skipUnless(routing_manager.MSGPACK_AVAILABLE, "msgpack未安装")
+    def test_binary_format_msgpack(self):
+        """测试msgpack格式的数据带有格式标记并可往返"""
+        self.manager.add_node("node1", "127.0.0.1", 8080, "pub_key1")
+        data = self.manager.to_bytes()
+        self.assertEqual(data[:1], b"M")
+        new_manager = RoutingTableManager.from_bytes(data)
+        self.assertEqual(new_manager.get_node("node1").to_dict(), self.manager.get_node("node1").to_dict())
+
+        with patch.object(routing_manager, "MSGPACK_AVAILABLE", False):
+            with self.assertRaises(ValueError):
+                RoutingTableManager.from_bytes(data)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -10,6 +10,12 @@ from src.core.chat_node import ChatNode
 
 class TestSystem(unittest.TestCase):
     """系统级测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        """RSA密钥生成开销较大，整个测试类共用一组密钥对"""
+        cls.crypto1 = CryptoManager()
+        cls.crypto2 = CryptoManager()
     
     def test_blockchain_functionality(self):
         """测试区块链功能"""
@@ -35,8 +41,8 @@ class TestSystem(unittest.TestCase):
     
     def test_crypto_functionality(self):
         """测试加密功能"""
-        crypto1 = CryptoManager()
-        crypto2 = CryptoManager()
+        crypto1 = self.crypto1
+        crypto2 = self.crypto2
         
         original_message = "Hello, this is a secret message!"
         print(f"原始消息: {original_message}")
@@ -174,6 +180,10 @@ class TestAllModules(unittest.TestCase):
         self.assertIsNotNone(node)
 
 
+# 系统测试包含的测试类
+SYSTEM_TEST_CASES = (TestSystem, TestAllModules)
+
+
 def run_system_tests():
     """运行系统测试"""
     print("开始运行系统测试...")
@@ -183,8 +193,8 @@ def run_system_tests():
     suite = unittest.TestSuite()
     
     # 添加测试
-    suite.addTests(loader.loadTestsFromTestCase(TestSystem))
-    suite.addTests(loader.loadTestsFromTestCase(TestAllModules))
+    for test_case in SYSTEM_TEST_CASES:
+        suite.addTests(loader.loadTestsFromTestCase(test_case))
     
     # 运行测试
     runner = unittest.TextTestRunner(verbosity=2)
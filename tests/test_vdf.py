@@ -1,14 +1,38 @@
 import unittest
 import asyncio
-from src.vdf.vdf import VDF, VDFProof, VDFManager, VDFBlockchain
+import hashlib
+from unittest.mock import patch
+from src.vdf import vdf as vdf_module
+from src.vdf.vdf import VDF, VDFProof, VDFManager, VDFBlockchain, WesolowskiVDF, shutdown_verify_pool
+from src.blockchain.block import Block
+from src.vdf._vdf_numba import hash_chain_from_digest, hash_chains_from_digests
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# 模块内所有异步测试共用的事件循环（安装uvloop时使用uvloop）
+_loop = None
+
+
+def setUpModule():
+    global _loop
+    _loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+
+
+def tearDownModule():
+    _loop.close()
 
 
 class TestVDF(unittest.TestCase):
     """VDF模块单元测试"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.vdf = VDF(difficulty=100)  # 使用较低难度以加快测试
+    @classmethod
+    def setUpClass(cls):
+        """测试前准备（VDF对象无状态，整个测试类共用）"""
+        cls.vdf = VDF(difficulty=100)  # 使用较低难度以加快测试
     
     def test_compute_and_verify(self):
         """测试VDF计算和验证"""
@@ -33,12 +57,40 @@ class TestVDF(unittest.TestCase):
         async def async_test():
             return await self.vdf.compute_async(challenge)
         
-        proof, computation_time = asyncio.run(async_test())
+        proof, computation_time = _loop.run_until_complete(async_test())
         
         # 验证证明
         is_valid = self.vdf.verify(challenge, proof)
         self.assertTrue(is_valid)
     
+    def test_verify_batch(self):
+        """测试批量验证VDF证明"""
+        challenges = ["batch_a", "batch_b", "batch_c"]
+        items = [(c, self.vdf.compute(c)[0], None) for c in challenges]
+        items.append(("batch_d", "invalid_proof", None))
+
+        results = self.vdf.verify_batch(items)
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_verify_batch_process_pool(self):
+        """测试批量验证分发到进程池，关闭后再次需要时重新创建"""
+        challenges = ["pool_a", "pool_b"]
+        items = [(c, self.vdf.compute(c)[0], None) for c in challenges]
+        items.append(("pool_c", "invalid_proof", None))
+
+        with patch.object(vdf_module, "PARALLEL_VERIFY_THRESHOLD", 1):
+            self.assertEqual(self.vdf.verify_batch(items), [True, True, False])
+            shutdown_verify_pool()
+            self.assertIsNone(vdf_module._VERIFY_PROCESS_POOL)
+            self.assertEqual(self.vdf.verify_batch(items), [True, True, False])
+        shutdown_verify_pool()
+
+    def test_compute_batch(self):
+        """测试批量计算VDF证明"""
+        challenges = ["batch_a", "batch_b"]
+        proofs = self.vdf.compute_batch(challenges)
+        self.assertEqual(self.vdf.verify_batch([(c, p, None) for c, p in zip(challenges, proofs)]), [True, True])
+
     def test_compute_with_witness(self):
         """测试带见证的VDF计算"""
         challenge = "witness_test_challenge"
@@ -55,6 +107,72 @@ class TestVDF(unittest.TestCase):
         self.assertIsInstance(witness, str)
 
 
+class TestWesolowskiVDF(unittest.TestCase):
+    """WesolowskiVDF类单元测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        """测试前准备（VDF对象无状态，整个测试类共用）"""
+        cls.vdf = WesolowskiVDF(difficulty=200)
+
+    def test_compute_and_verify_with_witness(self):
+        """测试带见证的计算和快速验证"""
+        challenge = "wesolowski_challenge"
+        proof, witness, computation_time = self.vdf.compute_with_witness(challenge)
+
+        self.assertTrue(self.vdf.verify(challenge, proof, witness=witness))
+        self.assertFalse(self.vdf.verify("other_challenge", proof, witness=witness))
+        self.assertFalse(self.vdf.verify(challenge, proof, 100, witness=witness))
+
+        forged_witness = format(int(witness, 16) + 1, 'x')
+        self.assertFalse(self.vdf.verify(challenge, proof, witness=forged_witness))
+
+    def test_verify_without_witness(self):
+        """测试未提供见证时重新计算验证"""
+        challenge = "wesolowski_no_witness"
+        proof, computation_time = self.vdf.compute(challenge)
+
+        self.assertTrue(self.vdf.verify(challenge, proof))
+        self.assertFalse(self.vdf.verify(challenge, "invalid_proof"))
+
+    def test_manager_scheme(self):
+        """测试VDFManager使用Wesolowski方案"""
+        manager = VDFManager(difficulty=200, scheme="wesolowski")
+        vdf_proof = _loop.run_until_complete(manager.generate_proof("manager_wesolowski"))
+
+        self.assertTrue(VDFManager(difficulty=200, scheme="wesolowski").verify_proof(vdf_proof))
+
+
+class TestVDFNumbaKernel(unittest.TestCase):
+    """Numba哈希链内核单元测试（未安装numba时以纯Python运行）"""
+
+    def test_matches_hashlib_chain(self):
+        """测试内核结果与hashlib逐轮计算一致"""
+        digest = hashlib.sha256(b"numba_kernel_challenge").digest()
+
+        expected = digest
+        for i in range(1, 6):
+            expected = hashlib.sha256(expected + i.to_bytes(8, 'little')).digest()
+
+        self.assertEqual(hash_chain_from_digest(digest, 1, 5), expected)
+
+    def test_large_counter(self):
+        """测试计数器超过32位时的编码"""
+        digest = hashlib.sha256(b"large_counter").digest()
+        counter = 2**32 + 7
+        expected = hashlib.sha256(digest + counter.to_bytes(8, 'little')).digest()
+        self.assertEqual(hash_chain_from_digest(digest, counter, 1), expected)
+
+    def test_multi_buffer_matches_single_chains(self):
+        """测试多缓冲区内核与逐条计算的链结果一致"""
+        digests = [hashlib.sha256(f"lane_{i}".encode()).digest() for i in range(17)]
+        for counter in (1, 2**32 - 2):
+            self.assertEqual(
+                hash_chains_from_digests(digests, counter, 3),
+                [hash_chain_from_digest(digest, counter, 3) for digest in digests]
+            )
+
+
 class TestVDFProof(unittest.TestCase):
     """VDFProof类单元测试"""
     
@@ -78,6 +196,20 @@ class TestVDFProof(unittest.TestCase):
         self.assertEqual(vdf_proof.computation_time, 1.5)
         self.assertEqual(vdf_proof.difficulty, 100)
     
+    def test_vdf_proof_equality(self):
+        """测试VDFProof按挑战、证明值和难度判等，可放入集合去重"""
+        proof_a = VDFProof(challenge="eq", proof="p", computation_time=1.0, difficulty=10)
+        proof_b = VDFProof(challenge="eq", proof="p", computation_time=2.0, difficulty=10)
+        proof_c = VDFProof(challenge="eq", proof="q", difficulty=10)
+
+        self.assertEqual(proof_a, proof_b)
+        self.assertNotEqual(proof_a, proof_c)
+        self.assertEqual(len({proof_a, proof_b, proof_c}), 2)
+
+        # 身份字段只读，放入集合后不会被改动
+        with self.assertRaises(AttributeError):
+            proof_a.proof = "q"
+
     def test_vdf_proof_serialization(self):
         """测试VDFProof序列化"""
         original_proof = VDFProof(
@@ -116,7 +248,7 @@ class TestVDFManager(unittest.TestCase):
         async def async_generate():
             return await self.vdf_manager.generate_proof(challenge)
         
-        vdf_proof = asyncio.run(async_generate())
+        vdf_proof = _loop.run_until_complete(async_generate())
         
         # 验证证明
         is_valid = self.vdf_manager.verify_proof(vdf_proof)
@@ -127,6 +259,60 @@ class TestVDFManager(unittest.TestCase):
         is_valid_cached = self.vdf_manager.verify_proof(vdf_proof)
         self.assertTrue(is_valid_cached)
     
+    def test_verified_proof_is_cached(self):
+        """测试验证通过的外部证明会被缓存"""
+        challenge = "remote_test_challenge"
+        remote_manager = VDFManager(difficulty=50)
+        vdf_proof = _loop.run_until_complete(remote_manager.generate_proof(challenge))
+
+        cache_key = VDFManager._cache_key(challenge)
+        self.assertNotIn(cache_key, self.vdf_manager.proof_cache)
+
+        self.assertTrue(self.vdf_manager.verify_proof(vdf_proof))
+        self.assertIn(cache_key, self.vdf_manager.proof_cache)
+        self.assertTrue(self.vdf_manager.verify_proof(vdf_proof))
+
+        # 篡改后的证明不能命中缓存
+        forged = VDFProof(challenge=challenge, proof="0" * 64, difficulty=50)
+        self.assertFalse(self.vdf_manager.verify_proof(forged))
+
+    def test_cache_respects_difficulty(self):
+        """测试低难度下验证通过的证明不能命中高难度的缓存"""
+        challenge = "difficulty_test_challenge"
+        cheap_proof = asyncio.run(VDFManager(difficulty=1).generate_proof(challenge))
+        self.assertTrue(self.vdf_manager.verify_proof(cheap_proof))
+
+        claimed = VDFProof(challenge=challenge, proof=cheap_proof.proof, difficulty=50)
+        self.assertFalse(self.vdf_manager.verify_proof(claimed))
+        self.assertEqual(self.vdf_manager.verify_proofs_batch([claimed]), [False])
+
+    def test_verify_proofs_batch(self):
+        """测试批量验证证明"""
+        remote_manager = VDFManager(difficulty=50)
+        proofs = [_loop.run_until_complete(remote_manager.generate_proof(f"batch_{i}")) for i in range(3)]
+        forged = VDFProof(challenge="batch_forged", proof="0" * 64, difficulty=50)
+
+        self.assertTrue(self.vdf_manager.verify_proof(proofs[0]))  # 第一个证明已在缓存中
+        self.assertEqual(self.vdf_manager.verify_proofs_batch(proofs + [forged, forged, proofs[2]]),
+                         [True, True, True, False, False, True])
+        for vdf_proof in proofs:
+            self.assertIn(VDFManager._cache_key(vdf_proof.challenge), self.vdf_manager.proof_cache)
+        self.assertNotIn(VDFManager._cache_key("batch_forged"), self.vdf_manager.proof_cache)
+
+    def test_cache_size_bound(self):
+        """测试缓存超出容量时淘汰最久未使用的证明"""
+        manager = VDFManager(difficulty=10, max_cache_size=2)
+        proofs = [_loop.run_until_complete(manager.generate_proof(f"lru_{i}")) for i in range(2)]
+        self.assertTrue(manager.verify_proof(proofs[0]))  # 刷新lru_0
+
+        _loop.run_until_complete(manager.generate_proof("lru_2"))
+        self.assertEqual(len(manager.proof_cache), 2)
+        self.assertIn(VDFManager._cache_key("lru_0"), manager.proof_cache)
+        self.assertNotIn(VDFManager._cache_key("lru_1"), manager.proof_cache)
+
+        # 被淘汰的证明仍可重新验证
+        self.assertTrue(manager.verify_proof(proofs[1]))
+
     def test_cache_cleanup(self):
         """测试缓存清理"""
         challenge = "cleanup_test_challenge"
@@ -134,11 +320,12 @@ class TestVDFManager(unittest.TestCase):
         async def async_generate():
             return await self.vdf_manager.generate_proof(challenge)
         
-        vdf_proof = asyncio.run(async_generate())
+        vdf_proof = _loop.run_until_complete(async_generate())
         self.vdf_manager.add_proof_to_cache(vdf_proof)
         
         # 验证缓存中有证明
-        cache_key = __import__('hashlib').sha256(vdf_proof.challenge.encode()).hexdigest()
+        cache_key = vdf_proof.cache_key
+        self.assertEqual(cache_key, VDFManager._cache_key(vdf_proof.challenge))
         self.assertIn(cache_key, self.vdf_manager.proof_cache)
         
         # 手动设置一个过期时间
@@ -164,7 +351,7 @@ class TestVDFBlockchain(unittest.TestCase):
         async def async_add_block():
             return await self.vdf_blockchain.add_block_with_vdf("Test data")
         
-        success = asyncio.run(async_add_block())
+        success = _loop.run_until_complete(async_add_block())
         self.assertTrue(success)
         
         # 验证区块链长度
@@ -184,18 +371,48 @@ class TestVDFBlockchain(unittest.TestCase):
                 results.append(result)
             return results
         
-        results = asyncio.run(async_add_blocks())
+        results = _loop.run_until_complete(async_add_blocks())
         self.assertTrue(all(results))
         
         # 验证整个区块链
         is_valid = self.vdf_blockchain.verify_blockchain_with_vdf()
         self.assertTrue(is_valid)
         
+        # 篡改已验证区块的VDF证明后应被检测到
+        tampered_block = self.vdf_blockchain.blockchain.chain[-1]
+        original_data = tampered_block.data
+        tampered_block.data = "VDF:" + "0" * 64 + original_data[68:]
+        tampered_block.hash = tampered_block.calculate_hash()
+        self.assertFalse(self.vdf_blockchain.verify_blockchain_with_vdf())
+        tampered_block.data = original_data
+        tampered_block.hash = tampered_block.calculate_hash()
+
+        self.assertTrue(_loop.run_until_complete(self.vdf_blockchain.verify_blockchain_with_vdf_async()))
+
         # 获取区块链信息
         info = self.vdf_blockchain.get_blockchain_info()
         self.assertEqual(info["length"], 4)  # 包括创世块
         self.assertTrue(info["valid"])
 
+    def test_cached_low_difficulty_proof_rejected(self):
+        """测试经verify_proof缓存的低难度证明不能通过链级验证"""
+        blockchain = self.vdf_blockchain.blockchain
+        previous_hash = blockchain.get_latest_block().hash
+        timestamp = 1700000000.0
+        data = "cheap block"
+        challenge = f"{previous_hash}{timestamp}{data}"
+
+        # 以难度1计算证明，并由外部输入使其进入验证缓存
+        cheap_proof = asyncio.run(VDFManager(difficulty=1).generate_proof(challenge))
+        self.assertTrue(self.vdf_blockchain.vdf_manager.verify_proof(
+            VDFProof(challenge=challenge, proof=cheap_proof.proof, difficulty=1)
+        ))
+
+        block = Block(index=len(blockchain.chain), previous_hash=previous_hash,
+                      timestamp=timestamp, data=f"VDF:{cheap_proof.proof}:{data}")
+        blockchain.add_block(block)
+        self.assertFalse(self.vdf_blockchain.verify_blockchain_with_vdf())
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,3 +1,5 @@
+import heapq
+import time
 import unittest
 from src.zkp.zkp import ZKPProof, ZKPGenerator, ZKPManager, ZKPBlockchainIntegration
 
@@ -43,6 +45,12 @@ class TestZKPProof(unittest.TestCase):
         self.assertEqual(original_proof.response, restored_proof.response)
         self.assertEqual(original_proof.public_data, restored_proof.public_data)
 
+    def test_ct_equal(self):
+        """测试恒定时间比较"""
+        proof = ZKPProof("s", "w", "1", "2", {"b": 1, "a": 2})
+        self.assertTrue(proof.ct_equal(ZKPProof("s", "w", "1", "2", {"a": 2, "b": 1})))
+        self.assertFalse(proof.ct_equal(ZKPProof("s", "w", "1", "3", {"a": 2, "b": 1})))
+
 
 class TestZKPGenerator(unittest.TestCase):
     """ZKPGenerator类单元测试"""
@@ -75,6 +83,16 @@ class TestZKPGenerator(unittest.TestCase):
         is_valid = self.generator.verify_proof(invalid_proof)
         self.assertFalse(is_valid)
 
+    def test_fixed_base_pow(self):
+        """测试固定底数查表幂运算与内置pow一致"""
+        p = self.generator.p
+        for e in (0, 1, 2, 255, 256, 123456789, p - 2, p - 1, 2**32 - 1):
+            self.assertEqual(self.generator._fixed_base_pow(e), pow(self.generator.g, e, p))
+
+    def test_g_table_shared(self):
+        """测试相同参数的生成器共用预计算表"""
+        self.assertIs(ZKPGenerator().g_table, self.generator.g_table)
+
 
 class TestZKPManager(unittest.TestCase):
     """ZKPManager类单元测试"""
@@ -127,6 +145,20 @@ class TestZKPManager(unittest.TestCase):
         is_valid = self.manager.verify_proof_data(invalid_proof)
         self.assertFalse(is_valid)
     
+    def test_verify_proof_batch(self):
+        """测试批量验证证明"""
+        ids = [self.manager.create_proof(f"batch_{i}", "shared_witness", {"i": i}) for i in range(3)]
+        ids.append(self.manager.create_proof("batch_other", "other_witness"))
+
+        # 篡改其中一个证明的响应
+        tampered = self.manager.get_proof(ids[1])
+        tampered.response = str((int(tampered.response) + 1) % self.manager.zkp_generator.p_minus_1)
+
+        self.assertEqual(
+            self.manager.verify_proof_batch(ids + ["nonexistent_proof_id"]),
+            [True, False, True, True, False]
+        )
+    
     def test_remove_proof(self):
         """测试移除证明"""
         statement = "removal_test"
@@ -150,6 +182,31 @@ class TestZKPManager(unittest.TestCase):
         is_valid_after = self.manager.verify_proof_by_id(proof_id)
         self.assertFalse(is_valid_after)
     
+    def test_cleanup_expired_proofs(self):
+        """测试清理过期证明"""
+        old_id = self.manager.create_proof("old_statement", "old_witness")
+        fresh_id = self.manager.create_proof("fresh_statement", "fresh_witness")
+        removed_id = self.manager.create_proof("removed_statement", "removed_witness")
+        self.manager.remove_proof(removed_id)
+
+        # 未过期时不清理
+        self.assertEqual(self.manager.cleanup_expired_proofs(max_age=3600), 0)
+        self.assertIn(old_id, self.manager.proof_store)
+
+        # 将一个证明的时间戳设为2秒前，1秒过期时只清理该证明
+        record = self.manager.proof_store[old_id]
+        record.timestamp = time.time() - 2
+        heapq.heappush(self.manager.expiry_index, (record.timestamp, old_id))
+        self.assertEqual(self.manager.cleanup_expired_proofs(max_age=1), 1)
+        self.assertNotIn(old_id, self.manager.proof_store)
+        self.assertIn(fresh_id, self.manager.proof_store)
+
+        # 已移除的证明不计入清理数量
+        removed = self.manager.cleanup_expired_proofs(max_age=-1)
+        self.assertEqual(removed, 1)
+        self.assertNotIn(fresh_id, self.manager.proof_store)
+        self.assertEqual(self.manager.expiry_index, [])
+
     def test_get_nonexistent_proof(self):
         """测试获取不存在的证明"""
         proof = self.manager.get_proof("nonexistent_proof_id")
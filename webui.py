@@ -2,146 +2,158 @@
 去中心化聊天系统 Web UI 控制台
 """
 import asyncio
+import functools
+import gzip
+import hashlib
 import json
+import os
 import webbrowser
-import threading
 import time
 from datetime import datetime
 from aiohttp import web, WSMsgType
 import aiohttp_cors
 import psutil
 import platform
+import signal
+import sys
 from src.core.chat_node import ChatNode
 from src.blockchain.blockchain import Blockchain
 from src.p2p.node_server import NodeServer
 from src.network.nat_traversal import setup_nat_traversal, NATTraverser
+from src.vdf.vdf import shutdown_verify_pool, warmup as warmup_vdf_kernels
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-class WebUI:
-    def __init__(self, chat_node: ChatNode):
-        self.chat_node = chat_node
-        self.clients = set()  # 存储WebSocket连接
-        self.app = web.Application()
-        self.setup_routes()
-        self.setup_cors()
-        
-    def setup_routes(self):
-        """设置路由"""
-        self.app.router.add_get('/', self.index)
-        self.app.router.add_get('/ws', self.websocket_handler)
-        self.app.router.add_get('/api/node/stats', self.get_node_stats)
-        self.app.router.add_get('/api/node/routing', self.get_routing_table)
-        self.app.router.add_get('/api/blockchain/info', self.get_blockchain_info)
-        self.app.router.add_get('/api/blockchain/chain', self.get_blockchain)
-        self.app.router.add_post('/api/messages/send', self.send_message)
-        self.app.router.add_post('/api/messages/send_multimedia', self.send_multimedia_message)
-        self.app.router.add_post('/api/consensus/propose', self.start_consensus_proposal)
-        self.app.router.add_post('/api/node/sync', self.sync_blockchain)
-        self.app.router.add_get('/api/system/info', self.get_system_info)
-        # 添加NAT穿越相关的API
-        self.app.router.add_get('/api/nat/status', self.get_nat_status)
-        self.app.router.add_post('/api/nat/configure', self.configure_nat_traversal)
-        self.app.router.add_static('/static', path='./static', name='static')
-        
-    def setup_cors(self):
-        """设置CORS"""
-        cors = aiohttp_cors.setup(self.app, defaults={
-            "*": aiohttp_cors.ResourceOptions(
-                allow_credentials=True,
-                expose_headers="*",
-                allow_headers="*",
-                allow_methods="*"
-            )
-        })
-        
-        # 为所有路由添加CORS支持
-        for route in list(self.app.router.routes()):
-            cors.add(route)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
-    async def get_nat_status(self, request):
-        """获取NAT穿越状态"""
-        nat_status = {
-            "enabled": getattr(self.chat_node, 'enable_nat_traversal', False),
-            "public_url": getattr(self.chat_node, 'public_url', None),
-            "nat_type": getattr(self.chat_node, 'nat_type', 'unknown'),
-            "external_ip": getattr(self.chat_node, 'external_ip', None),
-            "external_port": getattr(self.chat_node, 'external_port', None),
-            "is_traversable": getattr(self.chat_node, 'is_nat_traversable', False)
-        }
-        return web.json_response(nat_status)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
-    async def configure_nat_traversal(self, request):
-        """配置NAT穿越"""
-        try:
-            data = await request.json()
-            enable_nat = data.get('enable', False)
-            
-            if enable_nat and not getattr(self.chat_node, 'enable_nat_traversal', False):
-                # 启用NAT穿越
-                from src.config.config import get_config
-                config = get_config()
-                
-                # 获取节点当前监听的端口
-                local_port = self.chat_node.addr[1]
-                
-                success, public_url, nat_result = await setup_nat_traversal(
-                    config.config, local_port
-                )
-                
-                if success:
-                    self.chat_node.enable_nat_traversal = True
-                    self.chat_node.public_url = public_url
-                    self.chat_node.nat_type = nat_result.nat_type
-                    self.chat_node.external_ip = nat_result.external_ip
-                    self.chat_node.external_port = nat_result.external_port
-                    self.chat_node.is_nat_traversable = nat_result.is_traversable
-                    
-                    # 更新节点在路由表中的信息
-                    for node_id, node_info in self.chat_node.routing_table_manager.routing_table.items():
-                        if node_info.node_id == self.chat_node.node_id:
-                            node_info.public_url = public_url
-                            break
-                    
-                    return web.json_response({
-                        "status": "success", 
-                        "message": "NAT穿越配置成功",
-                        "public_url": public_url,
-                        "nat_result": {
-                            "nat_type": nat_result.nat_type,
-                            "external_ip": nat_result.external_ip,
-                            "external_port": nat_result.external_port,
-                            "is_traversable": nat_result.is_traversable
-                        }
-                    })
-                else:
-                    return web.json_response({
-                        "status": "error", 
-                        "message": "NAT穿越配置失败"
-                    }, status=500)
-            elif not enable_nat:
-                # 禁用NAT穿越
-                self.chat_node.enable_nat_traversal = False
-                self.chat_node.public_url = None
-                
-                return web.json_response({
-                    "status": "success", 
-                    "message": "NAT穿越已禁用"
-                })
-            else:
-                return web.json_response({
-                    "status": "success", 
-                    "message": "NAT穿越状态未改变"
-                })
-                
-        except Exception as e:
-            return web.json_response({
-                "status": "error", 
-                "message": f"配置NAT穿越时出错: {str(e)}"
-            }, status=500)
-        
-    async def index(self, request):
-        """主页"""
-        html_content = """
+
+def _dump_json(payload) -> bytes:
+    """将对象序列化为JSON bytes，安装orjson时使用orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload).encode('utf-8')
+
+
+def _json_response(payload, status: int = 200) -> web.Response:
+    """
+    构造JSON响应
+    安装orjson时直接序列化为bytes，比aiohttp默认的json.dumps更快
+    """
+    return _bytes_json_response(_dump_json(payload), status=status)
+
+
+def _etag(body: bytes) -> str:
+    """根据响应内容计算ETag"""
+    return '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _etag_matches(request, etag: str) -> bool:
+    """请求的If-None-Match是否包含给定的ETag"""
+    if_none_match = request.headers.get('If-None-Match')
+    return bool(if_none_match) and etag in (tag.strip() for tag in if_none_match.split(','))
+
+
+def _cached_json_response(request, body: bytes, etag: str) -> web.Response:
+    """返回带ETag的JSON响应，客户端已持有相同内容时返回304"""
+    if _etag_matches(request, etag):
+        return web.Response(status=304, headers={'ETag': etag})
+    return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+
+
+def _dump_blocks(blocks) -> bytes:
+    """将一批区块序列化为以逗号分隔的JSON对象（不含外层方括号）"""
+    return b','.join(_dump_json(block.to_dict()) for block in blocks)
+
+
+def _bytes_json_response(body: bytes, status: int = 200) -> web.Response:
+    """用已序列化的JSON bytes构造响应"""
+    return web.Response(body=body, status=status, content_type='application/json')
+
+
+# 系统指标的后台刷新间隔（秒）
+SYSINFO_REFRESH_INTERVAL = 2.0
+
+# WebSocket状态推送间隔（秒）
+BROADCAST_INTERVAL = 1.0
+# 每个WebSocket连接最多积压的待发送消息数，超出时断开该连接
+WS_SEND_QUEUE_SIZE = 256
+
+# 后台任务队列容量与消费协程数量，队列满时拒绝新请求（HTTP 503）
+WORK_QUEUE_SIZE = 1024
+WORKER_COUNT = 4
+
+# 流式返回区块链时每次写出的区块数
+CHAIN_STREAM_BATCH = 256
+
+# 读取上传的多媒体文件时每次读取的字节数
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+# 超过该大小（字节）的JSON在线程池中解析，避免大体积多媒体负载阻塞事件循环
+JSON_OFFLOAD_THRESHOLD = 256 * 1024
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+async def _parse_json(data):
+    """
+    解析请求体或WebSocket消息中的JSON
+    安装orjson时使用orjson.loads；数据较大时放到默认线程池中执行
+    """
+    if len(data) > JSON_OFFLOAD_THRESHOLD:
+        return await asyncio.get_running_loop().run_in_executor(None, _json_loads, data)
+    return _json_loads(data)
+
+
+async def _cancel_task(task):
+    """取消后台任务并等待其结束"""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def _open_browser(url: str):
+    """在浏览器中打开控制台（webbrowser.open可能阻塞，放到线程池中执行）"""
+    await asyncio.get_running_loop().run_in_executor(None, webbrowser.open, url)
+
+
+def _busy_response() -> web.Response:
+    """后台任务队列已满时的响应"""
+    return _json_response({'error': 'Server busy, try again later'}, status=503)
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """创建事件循环，安装uvloop时使用基于libuv的uvloop"""
+    return uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+
+
+def _run(coro):
+    """运行协程直至完成，安装uvloop时在uvloop上运行"""
+    if not UVLOOP_AVAILABLE:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 12):
+        return asyncio.run(coro, loop_factory=uvloop.new_event_loop)
+    uvloop.install()
+    return asyncio.run(coro)
+
+
+# 控制台主页，内容固定不变，导入时编码一次，所有请求共用
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -491,7 +503,319 @@ class WebUI:
 </body>
 </html>
         """
-        return web.Response(text=html_content, content_type='text/html')
+_INDEX_HTML_BYTES = _INDEX_HTML.encode('utf-8')
+_INDEX_DIGEST = hashlib.blake2b(_INDEX_HTML_BYTES, digest_size=16).hexdigest()
+# 静态目录以本模块所在目录为准，不依赖启动时的工作目录
+_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+_INDEX_PATH = os.path.join(_STATIC_DIR, 'index.html')
+
+# 预压缩格式：(Content-Encoding, 压缩文件后缀, 压缩函数)，按优先顺序排列
+_COMPRESSORS = (
+    (('br', '.br', lambda data: brotli.compress(data, quality=11)),) if BROTLI_AVAILABLE else ()
+) + (('gzip', '.gz', lambda data: gzip.compress(data, 9)),)
+# 需要预压缩的静态文件类型
+_COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js')
+
+
+def _index_variant(encoding: str, body: bytes):
+    """主页的一种编码形式：(Content-Encoding, 响应体, 响应头)，各编码使用不同的ETag"""
+    headers = {
+        'Cache-Control': 'public, max-age=3600',
+        'ETag': '"%s-%s"' % (_INDEX_DIGEST, encoding) if encoding else '"%s"' % _INDEX_DIGEST,
+        'Vary': 'Accept-Encoding',
+    }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return encoding, body, headers
+
+
+@functools.lru_cache(maxsize=64)
+def _accepted_encodings(accept_encoding: str) -> frozenset:
+    """
+    解析Accept-Encoding请求头，返回客户端可接受的编码集合
+    q=0表示明确拒绝该编码；"*"表示接受所有未单独列出的编码
+    """
+    accepted, rejected = set(), set()
+    for token in accept_encoding.split(','):
+        name, _, params = token.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        (accepted if q > 0 else rejected).add(name)
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _, _ in _COMPRESSORS if encoding not in rejected)
+    return frozenset(accepted)
+
+
+# 主页未写入磁盘时使用的内存版本，导入时压缩一次
+_INDEX_IDENTITY = _index_variant('', _INDEX_HTML_BYTES)
+_INDEX_VARIANTS = tuple(
+    _index_variant(encoding, compress(_INDEX_HTML_BYTES)) for encoding, _, compress in _COMPRESSORS
+)
+
+
+def _write_index_file() -> bool:
+    """
+    将主页写入静态目录（内容未变化时跳过写入），以便用FileResponse经sendfile发送
+    写入失败（如只读目录）时返回False
+    """
+    try:
+        with open(_INDEX_PATH, 'rb') as f:
+            if f.read() == _INDEX_HTML_BYTES:
+                return True
+    except OSError:
+        pass
+    try:
+        with open(_INDEX_PATH, 'wb') as f:
+            f.write(_INDEX_HTML_BYTES)
+        return True
+    except OSError:
+        return False
+
+
+def _precompress_static():
+    """
+    为静态目录中的文本文件生成预压缩版本（.br/.gz），源文件更新后才重新压缩
+    aiohttp的FileResponse（包括/static路由）会按Accept-Encoding自动发送这些文件，请求时无需压缩
+    """
+    try:
+        names = os.listdir(_STATIC_DIR)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(_COMPRESSIBLE_SUFFIXES):
+            continue
+        path = os.path.join(_STATIC_DIR, name)
+        try:
+            mtime = os.path.getmtime(path)
+            data = None
+            for _, suffix, compress in _COMPRESSORS:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                with open(target, 'wb') as f:
+                    f.write(compress(data))
+        except OSError:
+            continue
+
+
+# 运行期间不变的系统信息，导入时采集一次
+_STATIC_SYSTEM_INFO = {
+    "platform": platform.system(),
+    "platform_release": platform.release(),
+    "platform_version": platform.version(),
+    "architecture": platform.architecture()[0],
+    "processor": platform.processor(),
+    "cpu_count": psutil.cpu_count(),
+}
+
+# NAT状态响应中的字段，与get_nat_status中的取值顺序一致
+_NAT_STATUS_FIELDS = ("enabled", "public_url", "nat_type", "external_ip", "external_port", "is_traversable")
+
+
+class WebUI:
+    def __init__(self, chat_node: ChatNode):
+        self.chat_node = chat_node
+        self.clients = {}  # WebSocket连接 -> (发送队列, 发送协程)
+        self.client_snapshot = ()  # (连接, 发送队列)的只读快照，仅在连接增减时重建，广播时直接遍历
+        self.closing_clients = set()  # 因发送积压被断开、正在关闭的连接任务
+        self.index_on_disk = False  # 主页是否已写入静态目录（由prepare_static_files设置）
+        self.sysinfo_cache = None  # 最近一次采集的系统指标
+        self.sysinfo_task = None  # 后台刷新任务
+        self.routing_cache = None  # (路由表管理器, 版本号, 路由表字典, 序列化后的路由表, ETag)
+        self.broadcast_task = None  # WebSocket推送任务
+        self.chain_summary = None  # (区块链状态标识, 推送用的区块链概要)
+        self.last_state = {}  # 最近一次推送后客户端应持有的完整状态
+        self.chain_info_cache = None  # (区块链状态标识, 序列化后的区块链信息, ETag)
+        self.nat_status_cache = None  # (NAT状态取值, 序列化后的NAT状态, ETag)
+        self.work_queue = None  # 待执行的后台操作（返回协程的无参可调用对象）
+        self.workers = []  # 消费work_queue的协程
+        psutil.cpu_percent(interval=None)  # 建立CPU占用率的采样基准
+        self.app = web.Application()
+        self.setup_routes()
+        self.setup_cors()
+        self.app.on_startup.append(self._start_sysinfo_poller)
+        self.app.on_cleanup.append(self._stop_sysinfo_poller)
+        self.app.on_startup.append(self._start_broadcaster)
+        self.app.on_cleanup.append(self._stop_broadcaster)
+        self.app.on_startup.append(self._start_workers)
+        self.app.on_cleanup.append(self._stop_workers)
+        self.app.on_startup.append(self._warmup_vdf)
+        self.app.on_cleanup.append(self._shutdown_vdf)
+        
+    def prepare_static_files(self):
+        """
+        启动服务前的准备步骤：将主页写入静态目录，并为静态文件生成预压缩版本
+        构造WebUI时不写任何文件，由run()/main()在启动前显式调用；未调用时主页从内存发送
+        """
+        self.index_on_disk = _write_index_file()
+        _precompress_static()
+
+    def setup_routes(self):
+        """设置路由"""
+        self.app.router.add_get('/', self.index)
+        self.app.router.add_get('/ws', self.websocket_handler)
+        self.app.router.add_get('/api/node/stats', self.get_node_stats)
+        self.app.router.add_get('/api/node/routing', self.get_routing_table)
+        self.app.router.add_get('/api/blockchain/info', self.get_blockchain_info)
+        self.app.router.add_get('/api/blockchain/chain', self.get_blockchain)
+        self.app.router.add_post('/api/messages/send', self.send_message)
+        self.app.router.add_post('/api/messages/send_multimedia', self.send_multimedia_message)
+        self.app.router.add_post('/api/consensus/propose', self.start_consensus_proposal)
+        self.app.router.add_post('/api/node/sync', self.sync_blockchain)
+        self.app.router.add_get('/api/system/info', self.get_system_info)
+        # 添加NAT穿越相关的API
+        self.app.router.add_get('/api/nat/status', self.get_nat_status)
+        self.app.router.add_post('/api/nat/configure', self.configure_nat_traversal)
+        self.app.router.add_static('/static', path=_STATIC_DIR, name='static')
+        
+    def setup_cors(self):
+        """设置CORS"""
+        cors = aiohttp_cors.setup(self.app, defaults={
+            "*": aiohttp_cors.ResourceOptions(
+                allow_credentials=True,
+                expose_headers="*",
+                allow_headers="*",
+                allow_methods="*"
+            )
+        })
+        
+        # 为所有路由添加CORS支持
+        for route in list(self.app.router.routes()):
+            cors.add(route)
+
+    async def get_nat_status(self, request):
+        """获取NAT穿越状态（状态未变化时返回缓存的序列化结果）"""
+        node = self.chat_node
+        key = (node.enable_nat_traversal, node.public_url, node.nat_type,
+               node.external_ip, node.external_port, node.is_nat_traversable)
+        if self.nat_status_cache is None or self.nat_status_cache[0] != key:
+            nat_status = dict(zip(_NAT_STATUS_FIELDS, key))
+            body = _dump_json(nat_status)
+            self.nat_status_cache = (key, body, _etag(body))
+        return _cached_json_response(request, self.nat_status_cache[1], self.nat_status_cache[2])
+
+    async def configure_nat_traversal(self, request):
+        """配置NAT穿越"""
+        try:
+            data = await _parse_json(await request.read())
+            enable_nat = data.get('enable', False)
+            
+            if enable_nat and not self.chat_node.enable_nat_traversal:
+                # 启用NAT穿越
+                from src.config.config import get_config
+                config = get_config()
+                
+                # 获取节点当前监听的端口
+                local_port = self.chat_node.addr[1]
+                
+                # 复用节点的NAT穿越管理器，多次配置之间保留STUN socket和外部地址缓存
+                if self.chat_node.nat_traverser is None:
+                    self.chat_node.nat_traverser = NATTraverser(config.config)
+                success, public_url, nat_result = await setup_nat_traversal(
+                    config.config, local_port, self.chat_node.nat_traverser
+                )
+                
+                if success:
+                    self.chat_node.enable_nat_traversal = True
+                    self.chat_node.public_url = public_url
+                    self.chat_node.nat_type = nat_result.nat_type
+                    self.chat_node.external_ip = nat_result.external_ip
+                    self.chat_node.external_port = nat_result.external_port
+                    self.chat_node.is_nat_traversable = nat_result.is_traversable
+                    
+                    # 更新节点在路由表中的信息
+                    self_info = self.chat_node.routing_table_manager.get_node(self.chat_node.node_id)
+                    if self_info is not None:
+                        self_info.public_url = public_url
+                    
+                    return _json_response({
+                        "status": "success", 
+                        "message": "NAT穿越配置成功",
+                        "public_url": public_url,
+                        "nat_result": {
+                            "nat_type": nat_result.nat_type,
+                            "external_ip": nat_result.external_ip,
+                            "external_port": nat_result.external_port,
+                            "is_traversable": nat_result.is_traversable
+                        }
+                    })
+                else:
+                    return _json_response({
+                        "status": "error", 
+                        "message": "NAT穿越配置失败"
+                    }, status=500)
+            elif not enable_nat:
+                # 禁用NAT穿越
+                self.chat_node.enable_nat_traversal = False
+                self.chat_node.public_url = None
+                
+                return _json_response({
+                    "status": "success", 
+                    "message": "NAT穿越已禁用"
+                })
+            else:
+                return _json_response({
+                    "status": "success", 
+                    "message": "NAT穿越状态未改变"
+                })
+                
+        except Exception as e:
+            return _json_response({
+                "status": "error", 
+                "message": f"配置NAT穿越时出错: {str(e)}"
+            }, status=500)
+        
+    async def index(self, request):
+        """主页"""
+        if self.index_on_disk:
+            # FileResponse自行处理ETag/If-None-Match，并在Linux上使用sendfile零拷贝发送
+            return web.FileResponse(_INDEX_PATH, headers={'Cache-Control': 'public, max-age=3600'})
+        accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding, body, headers = next(
+            (variant for variant in _INDEX_VARIANTS if variant[0] in accepted), _INDEX_IDENTITY
+        )
+        if _etag_matches(request, headers['ETag']):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='text/html', charset='utf-8', headers=headers)
+
+    def _add_client(self, ws):
+        """登记WebSocket连接，为其创建发送队列和发送协程，并重建快照"""
+        queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.clients[ws] = (queue, asyncio.create_task(self._ws_writer(ws, queue)))
+        self._rebuild_client_snapshot()
+
+    def _remove_client(self, ws):
+        """移除WebSocket连接，停止其发送协程并重建快照"""
+        entry = self.clients.pop(ws, None)
+        if entry is not None:
+            entry[1].cancel()
+            self._rebuild_client_snapshot()
+
+    def _rebuild_client_snapshot(self):
+        """重建广播使用的连接快照"""
+        self.client_snapshot = tuple((ws, entry[0]) for ws, entry in self.clients.items())
+
+    async def _ws_writer(self, ws, queue: asyncio.Queue):
+        """逐条发送队列中的消息（UTF-8编码的JSON），每个连接只有这一个发送协程；发送失败时移除连接"""
+        while True:
+            payload = await queue.get()
+            try:
+                await ws.send_bytes(payload)
+            except Exception:
+                break
+        self._remove_client(ws)
 
     async def websocket_handler(self, request):
         """WebSocket处理器"""
@@ -499,135 +823,354 @@ class WebUI:
         await ws.prepare(request)
         
         # 添加客户端到连接集合
-        self.clients.add(ws)
+        self._add_client(ws)
         try:
             async for msg in ws:
                 if msg.type == WSMsgType.TEXT:
-                    data = json.loads(msg.data)
+                    data = await _parse_json(msg.data)
                     # 处理从客户端发送的消息
                     if data.get('action') == 'subscribe':
-                        # 客户端订阅更新
-                        pass
+                        # 客户端订阅更新：先发送一次完整状态，之后只会收到变化的部分
+                        if self.last_state:
+                            entry = self.clients.get(ws)
+                            if entry is not None:
+                                self._enqueue(ws, entry[0], _dump_json({"type": "update", **self.last_state}))
         finally:
-            self.clients.discard(ws)
+            self._remove_client(ws)
         
         return ws
 
     async def get_node_stats(self, request):
         """获取节点统计信息"""
         stats = self.chat_node.get_node_stats()
-        return web.json_response(stats)
+        return _json_response(stats)
 
-    async def get_routing_table(self, request):
-        """获取路由表"""
+    def _chain_key(self):
+        """标识区块链当前状态：链被整体替换、追加区块或末尾区块变化时都会改变"""
+        chain = self.chat_node.blockchain.chain
+        return id(chain), len(chain), chain[-1].hash if chain else None
+
+    async def _blockchain_summary(self) -> dict:
+        """区块链概要（不含区块数据），仅在区块链变化时在线程池中重新校验"""
+        key = self._chain_key()
+        if self.chain_summary is None or self.chain_summary[0] != key:
+            valid = await asyncio.get_running_loop().run_in_executor(
+                None, self.chat_node.blockchain.is_chain_valid
+            )
+            self.chain_summary = (key, {"length": key[1], "valid": valid})
+        return self.chain_summary[1]
+
+    async def broadcast(self, event: dict):
+        """
+        向所有WebSocket客户端推送事件，事件只序列化一次
+        发送由各连接的发送协程完成，慢客户端不会拖慢广播和其他客户端
+        """
+        snapshot = self.client_snapshot
+        if not snapshot:
+            return
+        payload = _dump_json(event)  # 所有连接共用同一份bytes，以二进制帧发送，不再逐连接编码
+        for ws, queue in snapshot:
+            self._enqueue(ws, queue, payload)
+
+    def _enqueue(self, ws, queue: asyncio.Queue, payload: bytes):
+        """
+        将消息放入连接的发送队列，由其发送协程写出
+        队列已满说明客户端跟不上，直接断开该连接
+        """
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self._remove_client(ws)
+            task = asyncio.create_task(ws.close())
+            self.closing_clients.add(task)
+            task.add_done_callback(self.closing_clients.discard)
+
+    async def _state_delta(self) -> dict:
+        """
+        采集当前推送状态，返回与上次推送相比发生变化的部分并记录为最新状态
+        节点统计按字段比较；路由表和区块链概要未变化时是同一个缓存对象，按整体比较
+        """
+        state = {
+            "stats": self.chat_node.get_node_stats(),
+            "routing": self._routing_snapshot()[0],
+            "blockchain": await self._blockchain_summary()
+        }
+        last = self.last_state
+        delta = {}
+        last_stats = last.get("stats", {})
+        stats_delta = {k: v for k, v in state["stats"].items() if k not in last_stats or last_stats[k] != v}
+        if stats_delta:
+            delta["stats"] = stats_delta
+        for section in ("routing", "blockchain"):
+            if last.get(section) is not state[section]:
+                delta[section] = state[section]
+        self.last_state = state
+        return delta
+
+    async def _broadcaster(self):
+        """定期向WebSocket客户端推送节点、路由表和区块链状态的变化部分，取代各客户端分别轮询"""
+        while True:
+            await asyncio.sleep(BROADCAST_INTERVAL)
+            if not self.client_snapshot:
+                continue
+            try:
+                delta = await self._state_delta()
+                if delta:
+                    await self.broadcast({"type": "update", **delta})
+            except Exception as e:
+                print(f"[!] 推送状态失败: {e}")
+
+    async def _start_broadcaster(self, app):
+        """应用启动时开始推送状态"""
+        self.broadcast_task = asyncio.create_task(self._broadcaster())
+
+    async def _stop_broadcaster(self, app):
+        """应用关闭时停止推送状态"""
+        if self.broadcast_task:
+            await _cancel_task(self.broadcast_task)
+            self.broadcast_task = None
+
+    def _routing_snapshot(self):
+        """返回路由表的(字典, 序列化bytes, ETag)，路由表版本未变时直接使用缓存"""
+        manager = self.chat_node.routing_table_manager
+        cached = self.routing_cache
+        if cached is not None and cached[0] is manager and cached[1] == manager.version:
+            return cached[2:]
+        
         routing_table = {
-            "nodes": []
+            "nodes": [
+                {
+                    "node_id": node_id,
+                    "host": node_info.host,
+                    "port": node_info.port,
+                    "pub_key": node_info.pub_key_short,
+                    "public_url": node_info.public_url or "N/A",
+                    "reputation": node_info.reputation_score
+                }
+                for node_id, node_info in manager.routing_table.items()
+            ]
         }
-        for node_id, node_info in self.chat_node.routing_table_manager.routing_table.items():
-            routing_table["nodes"].append({
-                "node_id": node_id,
-                "host": node_info.host,
-                "port": node_info.port,
-                "pub_key": node_info.pub_key[:50] + "..." if len(node_info.pub_key) > 50 else node_info.pub_key,
-                "public_url": node_info.public_url or "N/A",
-                "reputation": node_info.reputation_score
-            })
-        return web.json_response(routing_table)
+        body = _dump_json(routing_table)
+        etag = _etag(body)
+        self.routing_cache = (manager, manager.version, routing_table, body, etag)
+        return routing_table, body, etag
+
+    async def get_routing_table(self, request):
+        """获取路由表（路由表版本未变时直接返回缓存的序列化结果，客户端已是最新时返回304）"""
+        _, body, etag = self._routing_snapshot()
+        return _cached_json_response(request, body, etag)
 
     async def get_blockchain_info(self, request):
-        """获取区块链信息"""
-        info = self.chat_node.get_blockchain_info()
-        return web.json_response(info)
+        """
+        获取区块链信息
+        整链校验、转换和序列化开销随链长增长，在线程池中执行；区块链未变化时直接返回缓存的结果
+        """
+        key = self._chain_key()
+        if self.chain_info_cache is None or self.chain_info_cache[0] != key:
+            body = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: _dump_json(self.chat_node.get_blockchain_info())
+            )
+            self.chain_info_cache = (key, body, _etag(body))
+        return _cached_json_response(request, self.chain_info_cache[1], self.chain_info_cache[2])
 
     async def get_blockchain(self, request):
-        """获取区块链完整数据"""
-        chain = self.chat_node.get_blockchain_info()
-        return web.json_response(chain['chain'])
+        """
+        获取区块链完整数据
+        以JSON数组形式分批流式写出，每批只序列化少量区块，峰值内存与链长度无关，且每批之间让出事件循环
+        链长超过一批时在线程池中序列化各批，事件循环只负责写出
+        """
+        blocks = list(self.chat_node.blockchain.chain)  # 浅拷贝快照，防止发送期间链被替换
+        offload = len(blocks) > CHAIN_STREAM_BATCH
+        loop = asyncio.get_running_loop()
+        response = web.StreamResponse(headers={'Content-Type': 'application/json'})
+        await response.prepare(request)
+        separator = b'['
+        for start in range(0, len(blocks), CHAIN_STREAM_BATCH):
+            batch = blocks[start:start + CHAIN_STREAM_BATCH]
+            if offload:
+                body = await loop.run_in_executor(None, _dump_blocks, batch)
+            else:
+                body = _dump_blocks(batch)
+            await response.write(separator + body)
+            separator = b','
+        await response.write(b']' if separator == b',' else b'[]')
+        await response.write_eof()
+        return response
+
+    def _submit(self, job) -> bool:
+        """将后台操作放入有界队列，队列已满（或尚未启动）时返回False"""
+        if self.work_queue is None:
+            return False
+        try:
+            self.work_queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _worker(self):
+        """从队列中依次取出后台操作并执行"""
+        while True:
+            job = await self.work_queue.get()
+            try:
+                await job()
+            except Exception as e:
+                print(f"[!] 后台操作失败: {e}")
+            finally:
+                self.work_queue.task_done()
+
+    async def _start_workers(self, app):
+        """应用启动时创建任务队列和消费协程"""
+        self.work_queue = asyncio.Queue(maxsize=WORK_QUEUE_SIZE)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(WORKER_COUNT)]
+
+    async def _stop_workers(self, app):
+        """应用关闭时停止消费协程"""
+        for worker in self.workers:
+            await _cancel_task(worker)
+        self.workers = []
+        self.work_queue = None
 
     async def send_message(self, request):
         """发送消息"""
-        data = await request.json()
+        data = await _parse_json(await request.read())
         target_node_id = data.get('target')
         message = data.get('message')
         
         if not target_node_id or not message:
-            return web.json_response({'error': 'Missing target or message'}, status=400)
+            return _json_response({'error': 'Missing target or message'}, status=400)
         
         # 异步发送消息
-        asyncio.create_task(self.chat_node.send_message(target_node_id, message))
+        if not self._submit(functools.partial(self.chat_node.send_message, target_node_id, message)):
+            return _busy_response()
         
-        return web.json_response({'status': 'success'})
+        return _json_response({'status': 'success'})
 
     async def send_multimedia_message(self, request):
-        """发送多媒体消息"""
-        data = await request.json()
-        target_node_id = data.get('target')
-        media_type = data.get('media_type')
-        media_data = data.get('media_data')  # 实际应用中这会是文件数据
+        """
+        发送多媒体消息
+        请求为multipart/form-data：文本字段target、media_type，文件字段media；
+        文件按块读取，不经过base64和JSON解码，超过多媒体大小上限时立即拒绝
+        """
+        if not request.content_type.startswith('multipart/'):
+            return _json_response({'error': 'Expected multipart/form-data'}, status=400)
+        
+        max_size = self.chat_node.multimedia_processor.max_size
+        fields = {}
+        media_data = bytearray()  # 按块追加，直接交给节点处理，不再整体复制为bytes
+        reader = await request.multipart()
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            if part.name == 'media':
+                while True:
+                    chunk = await part.read_chunk(MEDIA_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    media_data += chunk
+                    if len(media_data) > max_size:
+                        return _json_response({'error': 'Media too large'}, status=413)
+            else:
+                fields[part.name] = await part.text()
         
+        target_node_id = fields.get('target')
+        media_type = fields.get('media_type')
         if not target_node_id or not media_type or not media_data:
-            return web.json_response({'error': 'Missing required fields'}, status=400)
+            return _json_response({'error': 'Missing required fields'}, status=400)
         
         # 异步发送多媒体消息
-        # 注意：实际实现中需要处理文件上传
-        # asyncio.create_task(self.chat_node.send_multimedia_message(target_node_id, media_type, media_data.encode()))
+        if not self._submit(functools.partial(
+                self.chat_node.send_multimedia_message, target_node_id, media_type, media_data)):
+            return _busy_response()
         
-        return web.json_response({'status': 'success'})
+        return _json_response({'status': 'success'})
 
     async def start_consensus_proposal(self, request):
         """发起共识提案"""
-        data = await request.json()
+        data = await _parse_json(await request.read())
         proposal_data = data.get('data')
         
         if not proposal_data:
-            return web.json_response({'error': 'Missing proposal data'}, status=400)
+            return _json_response({'error': 'Missing proposal data'}, status=400)
         
         # 异步发起共识
-        asyncio.create_task(self.chat_node.start_consensus_proposal(proposal_data))
+        if not self._submit(functools.partial(self.chat_node.start_consensus_proposal, proposal_data)):
+            return _busy_response()
         
-        return web.json_response({'status': 'success'})
+        return _json_response({'status': 'success'})
 
     async def sync_blockchain(self, request):
         """同步区块链"""
         # 异步同步区块链
-        asyncio.create_task(self.chat_node.sync_blockchain())
+        if not self._submit(self.chat_node.sync_blockchain):
+            return _busy_response()
         
-        return web.json_response({'status': 'sync started'})
+        return _json_response({'status': 'sync started'})
     
+    def _sample_system_info(self) -> dict:
+        """采集会变化的系统指标（在线程池中执行）"""
+        memory = psutil.virtual_memory()
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_total": memory.total,
+            "memory_available": memory.available,
+            "memory_percent": memory.percent,
+            "disk_usage": psutil.disk_usage('/').percent if hasattr(psutil, 'disk_usage') else 0,
+        }
+
+    async def _poll_system_info(self):
+        """后台定期刷新系统指标缓存"""
+        loop = asyncio.get_running_loop()
+        while True:
+            self.sysinfo_cache = await loop.run_in_executor(None, self._sample_system_info)
+            await asyncio.sleep(SYSINFO_REFRESH_INTERVAL)
+
+    async def _start_sysinfo_poller(self, app):
+        """应用启动时开始刷新系统指标"""
+        self.sysinfo_task = asyncio.create_task(self._poll_system_info())
+
+    async def _stop_sysinfo_poller(self, app):
+        """应用关闭时停止刷新系统指标"""
+        if self.sysinfo_task:
+            await _cancel_task(self.sysinfo_task)
+            self.sysinfo_task = None
+
     async def get_system_info(self, request):
-        """获取系统信息"""
-        import psutil
-        import platform
+        """获取系统信息（指标由后台任务定期刷新，请求时不阻塞事件循环）"""
+        if self.sysinfo_cache is None:
+            self.sysinfo_cache = await asyncio.get_running_loop().run_in_executor(
+                None, self._sample_system_info
+            )
         
-        system_info = {
-            "platform": platform.system(),
-            "platform_release": platform.release(),
-            "platform_version": platform.version(),
-            "architecture": platform.architecture()[0],
-            "processor": platform.processor(),
-            "cpu_count": psutil.cpu_count(),
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "memory_total": psutil.virtual_memory().total,
-            "memory_available": psutil.virtual_memory().available,
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent if hasattr(psutil, 'disk_usage') else 0,
+        system_info = dict(_STATIC_SYSTEM_INFO)
+        system_info.update(self.sysinfo_cache)
+        system_info.update({
             "uptime": time.time() - self.chat_node.start_time if hasattr(self.chat_node, 'start_time') else 0,
             "node_id": self.chat_node.node_id,
             "node_addr": self.chat_node.addr,
-        }
+        })
         
-        return web.json_response(system_info)
+        return _json_response(system_info)
+
+    async def _warmup_vdf(self, app):
+        """应用启动时在线程池中预热VDF哈希链内核，首次验证时不再承担编译开销"""
+        await asyncio.get_running_loop().run_in_executor(None, warmup_vdf_kernels)
+
+    async def _shutdown_vdf(self, app):
+        """应用关闭时关闭VDF并行验证使用的进程池"""
+        await asyncio.get_running_loop().run_in_executor(None, shutdown_verify_pool)
 
     def run(self, host='localhost', port=8080):
         """运行Web服务器"""
-        # 在新线程中打开浏览器
-        def open_browser():
-            webbrowser.open(f'http://{host}:{port}')
+        # 服务器启动后打开浏览器
+        async def open_browser(app):
+            app['browser_task'] = asyncio.create_task(_open_browser(f'http://{host}:{port}'))
         
-        threading.Thread(target=open_browser).start()
+        self.app.on_startup.append(open_browser)
+        self.prepare_static_files()
         
         # 运行Web服务器
-        web.run_app(self.app, host=host, port=port)
+        web.run_app(self.app, host=host, port=port, loop=_new_event_loop())
 
 
 def main():
@@ -657,6 +1200,7 @@ def main():
     
     # 创建并运行Web UI
     webui = WebUI(chat_node)
+    webui.prepare_static_files()
 
     print("正在启动去中心化聊天系统Web控制台...")
     print("访问 http://localhost:8080 查看控制台")
@@ -673,26 +1217,29 @@ def main():
         await site.start()
         print(f"[+] Web服务器已在 http://localhost:8080 启动")
         
-        # 保持服务运行
+        # 服务器已开始监听，直接打开浏览器
+        browser_task = asyncio.create_task(_open_browser('http://localhost:8080'))
+        
+        # 保持服务运行，直到收到SIGINT/SIGTERM（期间不再定时唤醒事件循环）
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows不支持add_signal_handler，仍由KeyboardInterrupt退出
         try:
-            while True:
-                await asyncio.sleep(1)
+            await stop_event.wait()
+            print("\n正在关闭服务...")
         except asyncio.CancelledError:
             print("\n正在关闭服务...")
         finally:
+            await _cancel_task(browser_task)
             await runner.cleanup()
     
     # 运行所有服务
     try:
-        # 在新线程中打开浏览器
-        def open_browser():
-            import time
-            time.sleep(2)  # 等待服务器启动
-            webbrowser.open('http://localhost:8080')
-        
-        threading.Thread(target=open_browser).start()
-        
-        asyncio.run(start_services())
+        _run(start_services())
     except KeyboardInterrupt:
         print("\n正在关闭服务...")
 